@@ -0,0 +1,105 @@
+"""
+Runs the AI search in a background process so the frame loop keeps drawing.
+
+A thread would share the interpreter lock with the frame loop and halve the frame
+rate, so the search lives in a long-running child process with its own
+transposition table. Each request sends a detached copy of the position; the
+chosen move comes back on a queue that the frame loop polls once per frame.
+"""
+from __future__ import annotations
+import multiprocessing
+import os
+import queue
+from typing import Optional
+
+from move import Move
+from parallel import reset_child_signals
+from search import Search, MAX_DEPTH
+from transposition import TranspositionTable
+
+
+def search_process(requests, results, cancelled) -> None:
+    reset_child_signals()
+    if hasattr(os, "nice"):
+        # On a busy machine the frame loop gets the CPU first
+        os.nice(10)
+    tt = TranspositionTable()
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        generation, position, time_limit, node_limit, depth = request
+        if cancelled.value >= generation:
+            continue
+        position.tt = tt
+        search = Search(position, tt)
+        search.stop_callback = lambda: cancelled.value >= generation
+        move = search.iterative_deepening(depth or MAX_DEPTH, time_limit, node_limit)
+        results.put((generation, move.key() if move is not None else 0))
+
+
+class SearchWorker:
+    def __init__(self):
+        self.process = None
+        self.requests = None
+        self.results = None
+        # Highest generation that was cancelled, shared with the child
+        self.cancelled = None
+        # Bumped on every start so results of abandoned searches are ignored
+        self.generation = 0
+        self.active = False
+        self.position_hash = None
+
+    def ensure_process(self) -> None:
+        if self.process is not None and self.process.is_alive():
+            return
+        self.requests = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        self.cancelled = multiprocessing.Value("i", self.generation)
+        self.process = multiprocessing.Process(target=search_process,
+                                               args=(self.requests, self.results, self.cancelled),
+                                               daemon=True)
+        self.process.start()
+
+    def start(self, board, time_limit=None, node_limit=None, depth=None) -> None:
+        self.cancel()
+        self.ensure_process()
+        self.generation += 1
+        position = board.copy()
+        # The child has its own table, the GUI board's one stays here
+        position.tt = None
+        self.position_hash = board.hash
+        self.active = True
+        self.requests.put((self.generation, position, time_limit, node_limit, depth))
+
+    def poll(self, board) -> Optional[Move]:
+        # The move of the running search once it is done, None while still thinking
+        if self.results is None:
+            return None
+        while True:
+            try:
+                generation, key = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if generation != self.generation:
+                continue
+            self.active = False
+            if board.hash != self.position_hash:
+                # The board changed under the search, the caller will start a new one
+                return None
+            for move in board.generate_moves():
+                if move.key() == key:
+                    return move
+            return None
+
+    def cancel(self) -> None:
+        if self.cancelled is not None:
+            self.cancelled.value = self.generation
+        self.active = False
+
+    def shutdown(self) -> None:
+        self.cancel()
+        if self.process is not None and self.process.is_alive():
+            self.requests.put(None)
+            self.process.join(timeout=1)
+        self.process = None
@@ -0,0 +1,147 @@
+"""
+Bitboard helpers and precomputed attack tables.
+
+Squares are numbered row * 8 + col, the same layout as Board.grid, so square 0 is
+a8 (black's queen rook) and square 63 is h1. Bit n of a bitboard is set when
+square n is occupied.
+"""
+from typing import List, Tuple
+
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+EMPTY = -1
+
+COLOR_NAMES = ("white", "black")
+FULL = (1 << 64) - 1
+
+FILE_A = sum(1 << (r * 8) for r in range(8))
+FILE_H = FILE_A << 7
+ROW_1 = 0xFF << 56  # White's back rank
+ROW_2 = 0xFF << 48
+ROW_7 = 0xFF << 8
+ROW_8 = 0xFF        # Black's back rank
+
+# (r, c) tuple for every square so hot paths never build positions
+POSITIONS: List[Tuple[int, int]] = [(sq >> 3, sq & 7) for sq in range(64)]
+
+# Ray directions as (dr, dc). Directions 0-3 increase the square index, 4-7 decrease it,
+# which tells us whether the nearest blocker is the lowest or the highest set bit.
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1), (-1, 0), (0, -1), (-1, -1), (-1, 1)]
+ROOK_DIRECTIONS = (0, 1, 4, 5)
+BISHOP_DIRECTIONS = (2, 3, 6, 7)
+
+
+def square(pos: Tuple[int, int]) -> int:
+    return pos[0] * 8 + pos[1]
+
+
+def piece_code(color: int, kind: int) -> int:
+    return color * 6 + kind
+
+
+def lsb(bb: int) -> int:
+    return (bb & -bb).bit_length() - 1
+
+
+def iter_bits(bb: int):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+def _jump_table(offsets) -> List[int]:
+    table = []
+    for sq in range(64):
+        r, c = POSITIONS[sq]
+        mask = 0
+        for dr, dc in offsets:
+            rr, cc = r + dr, c + dc
+            if 0 <= rr < 8 and 0 <= cc < 8:
+                mask |= 1 << (rr * 8 + cc)
+        table.append(mask)
+    return table
+
+
+def _ray_table() -> List[List[int]]:
+    rays = []
+    for dr, dc in DIRECTIONS:
+        table = []
+        for sq in range(64):
+            r, c = POSITIONS[sq]
+            mask = 0
+            rr, cc = r + dr, c + dc
+            while 0 <= rr < 8 and 0 <= cc < 8:
+                mask |= 1 << (rr * 8 + cc)
+                rr += dr
+                cc += dc
+            table.append(mask)
+        rays.append(table)
+    return rays
+
+
+KNIGHT_ATTACKS = _jump_table([(-2, 1), (1, 2), (2, 1), (1, -2), (2, -1), (-2, -1), (-1, -2), (-1, 2)])
+KING_ATTACKS = _jump_table([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+# PAWN_ATTACKS[color][sq] is the set of squares a pawn of that color on sq attacks
+PAWN_ATTACKS = [_jump_table([(-1, -1), (-1, 1)]), _jump_table([(1, -1), (1, 1)])]
+RAYS = _ray_table()
+
+# RAYS as square lists for walking a ray up to its first blocker: RAY_SQUARES[d][sq] runs outwards from sq in
+# direction d, nearest square first
+RAY_SQUARES = [[sorted(iter_bits(ray), reverse=d >= 4) for ray in table] for d, table in enumerate(RAYS)]
+
+
+def _slide(sq: int, occupied: int, directions) -> int:
+    attacks = 0
+    for d in directions:
+        ray = RAYS[d][sq]
+        blockers = ray & occupied
+        if blockers:
+            # Cut the ray after the nearest blocker
+            first = (blockers & -blockers).bit_length() - 1 if d < 4 else blockers.bit_length() - 1
+            ray ^= RAYS[d][first]
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    return _slide(sq, occupied, ROOK_DIRECTIONS)
+
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    return _slide(sq, occupied, BISHOP_DIRECTIONS)
+
+
+def queen_attacks(sq: int, occupied: int) -> int:
+    return _slide(sq, occupied, range(8))
+
+
+def piece_attacks(code: int, sq: int, occupied: int) -> int:
+    kind = code % 6
+    if kind == PAWN:
+        return PAWN_ATTACKS[code // 6][sq]
+    if kind == KNIGHT:
+        return KNIGHT_ATTACKS[sq]
+    if kind == KING:
+        return KING_ATTACKS[sq]
+    if kind == BISHOP:
+        return bishop_attacks(sq, occupied)
+    if kind == ROOK:
+        return rook_attacks(sq, occupied)
+    return queen_attacks(sq, occupied)
+
+
+def _line_tables() -> Tuple[List[List[int]], List[List[int]]]:
+    # BETWEEN[a][b]: squares strictly between two aligned squares, LINE[a][b]: the whole line through them
+    between = [[0] * 64 for _ in range(64)]
+    line = [[0] * 64 for _ in range(64)]
+    for a in range(64):
+        for d in range(8):
+            ray = RAYS[d][a]
+            for b in iter_bits(ray):
+                between[a][b] = ray & ~RAYS[d][b] & ~(1 << b)
+                line[a][b] = RAYS[d][a] | RAYS[d ^ 4][a] | (1 << a)
+    return between, line
+
+
+BETWEEN, LINE = _line_tables()
@@ -1,62 +1,131 @@
 from __future__ import annotations
-import random
+import copy
 from typing import Tuple, Optional, List
 
-import pygame
-from settings import settings
-from move import Move
+from move import Move, PromotionMove, EnPassantMove, CastlingMove, square_name, parse_square
+from zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EP_FILE_KEYS
+from transposition import TranspositionTable, DEFAULT_SIZE_MB
+from search import Search, MAX_DEPTH
+from parallel import ParallelSearch
+from evaluation import MG_TABLE, EG_TABLE, PHASE_WEIGHTS, SEE_VALUES, taper
 from piece import *
+from bitboard import (WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, EMPTY, FULL, FILE_A,
+                      FILE_H, ROW_1, ROW_2, ROW_7, ROW_8, POSITIONS, RAYS, RAY_SQUARES, ROOK_DIRECTIONS, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS,
+                      BETWEEN, LINE, square, piece_code, lsb, iter_bits, rook_attacks, bishop_attacks, queen_attacks,
+                      piece_attacks)
 
 Position = Tuple[int, int]
 Color = str
 
+PIECE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)
+
+# Game status
+ONGOING, CHECKMATE, STALEMATE, DRAW = "ongoing", "checkmate", "stalemate", "draw"
+# Plies without a capture or pawn move after which the game is drawn
+FIFTY_MOVE_PLIES = 100
+
+# Castling rights bits
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+# Rights that survive a move touching each square
+CASTLING_MASK = [15] * 64
+CASTLING_MASK[0] = 15 & ~BLACK_QUEENSIDE
+CASTLING_MASK[4] = 15 & ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_MASK[7] = 15 & ~BLACK_KINGSIDE
+CASTLING_MASK[56] = 15 & ~WHITE_QUEENSIDE
+CASTLING_MASK[60] = 15 & ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASK[63] = 15 & ~WHITE_KINGSIDE
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+# FEN letters in piece kind order, and castling letters with their rights bits
+FEN_PIECES = "pnbrqk"
+FEN_CASTLING = {"K": WHITE_KINGSIDE, "Q": WHITE_QUEENSIDE, "k": BLACK_KINGSIDE, "q": BLACK_QUEENSIDE}
+# Castling right -> (color, king square, rook square) the right needs on their home squares
+CASTLING_HOMES = {WHITE_KINGSIDE: (WHITE, 60, 63), WHITE_QUEENSIDE: (WHITE, 60, 56),
+                  BLACK_KINGSIDE: (BLACK, 4, 7), BLACK_QUEENSIDE: (BLACK, 4, 0)}
+
+
+def color_index(color: Color) -> int:
+    return WHITE if color == "white" else BLACK
+
+
 class Board:
-    def __init__(self):
+    def __init__(self, fen: str = START_FEN):
         self.grid: List[List[Optional[Piece]]] = [[None] * 8 for _ in range(8)]
-        self.to_move: Color = "white"
-        self.starting_position = [
-            ['r', 'n', 'b', 'q', 'k', 'b', 'n', 'r'],
-            ['p', 'p', 'p', 'p', 'p', 'p', 'p', 'p'],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            ['P', 'P', 'P', 'P', 'P', 'P', 'P', 'P'],
-            ['R', 'N', 'B', 'Q', 'K', 'B', 'N', 'R']
-        ]
-        """
-       ['r', 'n', 'b', 'q', 'k', 'b', 'n', 'r'],
-            ['p', 'p', 'p', 'p', 'p', 'p', 'p', 'p'],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            ['P', 'P', 'P', 'P', 'P', 'P', 'P', 'P'],
-            ['R', 'N', 'B', 'Q', 'K', 'B', 'N', 'R']
-            
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', 'K', ' '],
-            [' ', 'P', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', 'k', ' '],
-
-        """
-        self.attacked_by_white = [[False] * 8 for _ in range(8)]
-        self.attacked_by_black = [[False] * 8 for _ in range(8)]
+        self.side = WHITE
+        # Number of pieces of each color attacking every square
+        self.attack_counts = [[0] * 64, [0] * 64]
+        # Bitboard backend, kept in sync with grid. Piece codes are color * 6 + kind.
+        self.bitboards = [0] * 12
+        self.occupancy = [0, 0]
+        self.occupied = 0
+        self.mailbox = [EMPTY] * 64
+        # Irreversible state, saved on the history stack by make_move
+        self.castling = 0
+        self.ep_square = -1
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.history = []
+        # Status and legal moves of the position they were computed for, see game_status()
+        self.status_key = None
+        self.status = ONGOING
+        self.legal_move_cache: List[Move] = []
+        # Zobrist key of the position, updated with every change to the board
+        self.hash = 0
+        # Piece-square sums of the tapered evaluation and the game phase, updated with every change like the hash
+        self.mg_score = 0
+        self.eg_score = 0
+        self.phase = 0
+        # Check the incremental hash and evaluation against a full recompute after every move
+        self.debug = False
+        # Transposition table, allocated by the first search that asks for it (see the tt property)
+        self._tt: Optional[TranspositionTable] = None
+        self.hash_size_mb = DEFAULT_SIZE_MB
+        # Root-splitting search over several processes, used by find_best_move when set
+        self.parallel: Optional[ParallelSearch] = None
         self.flipped = False
-        self.en_passant_target = None
         self.last_move = None
-        self.setup()
-        self.undo_queue = 0
-        # Random AI timer
-        self.initial_time = random.randint(100, 200)
-        self.timer = self.initial_time
-        self.initial_color = self.to_move
         # Move log
         self.move_log = []
+        self.set_fen(fen)
+        self.initial_color = self.to_move
+
+    @classmethod
+    def from_fen(cls, fen: str) -> Board:
+        return cls(fen)
+
+    @property
+    def tt(self) -> TranspositionTable:
+        # Built on first use so boards that never search, e.g. bulk-loaded positions, stay small
+        if self._tt is None:
+            self._tt = TranspositionTable(self.hash_size_mb)
+        return self._tt
+
+    @tt.setter
+    def tt(self, tt: Optional[TranspositionTable]) -> None:
+        self._tt = tt
+        if tt is not None:
+            self.hash_size_mb = tt.size_mb
+
+    @property
+    def to_move(self) -> Color:
+        return "white" if self.side == WHITE else "black"
+
+    @to_move.setter
+    def to_move(self, color: Color) -> None:
+        if color_index(color) != self.side:
+            self.switch_color()
+
+    @property
+    def en_passant_target(self) -> Optional[Position]:
+        return POSITIONS[self.ep_square] if self.ep_square >= 0 else None
+
+    @en_passant_target.setter
+    def en_passant_target(self, pos: Optional[Position]) -> None:
+        if self.ep_square >= 0:
+            self.hash ^= EP_FILE_KEYS[self.ep_square & 7]
+        self.ep_square = square(pos) if pos is not None else -1
+        if self.ep_square >= 0:
+            self.hash ^= EP_FILE_KEYS[self.ep_square & 7]
 
     def board_to_screen(self, r, c):
         if self.flipped:
@@ -77,24 +146,221 @@ class Board:
             return 7 - r, 7 - c
         return r, c
 
-    def setup(self):
-        for i in range(8):
-            for j in range(8):
-                c = self.starting_position[i][j]
-                color = "white" if c.isupper() else "black"
-                match c.lower():
-                    case "r":
-                        self.grid[i][j] = Rook((i, j), color)
-                    case "b":
-                        self.grid[i][j] = Bishop((i, j), color)
-                    case "q":
-                        self.grid[i][j] = Queen((i, j), color)
-                    case "p":
-                        self.grid[i][j] = Pawn((i, j), color)
-                    case "n":
-                        self.grid[i][j] = Knight((i, j), color)
-                    case 'k':
-                        self.grid[i][j] = King((i, j), color)
+    def set_fen(self, fen: str) -> None:
+        # Load a position; the engine state is built directly and the Piece grid follows from it
+        fields = fen.split()
+        if len(fields) < 4 or len(fields) > 6:
+            raise ValueError(f"Invalid FEN: {fen}")
+        rows = fields[0].split("/")
+        if len(rows) != 8:
+            raise ValueError(f"Invalid FEN placement: {fields[0]}")
+        bitboards = [0] * 12
+        mailbox = [EMPTY] * 64
+        for r, row in enumerate(rows):
+            c = 0
+            for ch in row:
+                if ch.isdigit():
+                    c += int(ch)
+                    continue
+                kind = FEN_PIECES.find(ch.lower())
+                if kind < 0 or c > 7:
+                    raise ValueError(f"Invalid FEN placement: {fields[0]}")
+                code = piece_code(WHITE if ch.isupper() else BLACK, kind)
+                mailbox[r * 8 + c] = code
+                bitboards[code] |= 1 << (r * 8 + c)
+                c += 1
+            if c != 8:
+                raise ValueError(f"Invalid FEN placement: {fields[0]}")
+        if fields[1] not in ("w", "b"):
+            raise ValueError(f"Invalid FEN side to move: {fields[1]}")
+        castling = 0
+        if fields[2] != "-":
+            for ch in fields[2]:
+                if ch not in FEN_CASTLING:
+                    raise ValueError(f"Invalid FEN castling rights: {fields[2]}")
+                castling |= FEN_CASTLING[ch]
+        # A right whose king or rook is not at home cannot be used, whatever the FEN says
+        for right, (color, king_sq, rook_sq) in CASTLING_HOMES.items():
+            if mailbox[king_sq] != piece_code(color, KING) or mailbox[rook_sq] != piece_code(color, ROOK):
+                castling &= ~right
+        side = WHITE if fields[1] == "w" else BLACK
+        ep = -1 if fields[3] == "-" else parse_square(fields[3])
+        if ep >= 0:
+            # The square behind a pawn of the side not to move that has just made a double step
+            pushed = ep + 8 if side == WHITE else ep - 8
+            if ep >> 3 != (2 if side == WHITE else 5) or mailbox[pushed] != piece_code(1 - side, PAWN):
+                raise ValueError(f"Invalid FEN en passant square: {fields[3]}")
+        try:
+            halfmove = int(fields[4]) if len(fields) > 4 else 0
+            fullmove = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError(f"Invalid FEN move counters: {fen}") from None
+
+        self.bitboards = bitboards
+        self.mailbox = mailbox
+        self.occupancy = [0, 0]
+        for code in range(12):
+            self.occupancy[code // 6] |= bitboards[code]
+        self.occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+        self.side = side
+        self.castling = castling
+        self.ep_square = ep
+        self.halfmove_clock = halfmove
+        self.fullmove_number = fullmove
+        self.history = []
+        self.move_log = []
+        self.last_move = None
+        self.status_key = None
+        self.update_attack_maps()
+        self.hash = self.compute_hash()
+        self.mg_score, self.eg_score, self.phase = self.compute_evaluation()
+        self.sync_grid()
+
+    def to_fen(self) -> str:
+        rows = []
+        for r in range(8):
+            row = ""
+            empty = 0
+            for code in self.mailbox[r * 8:r * 8 + 8]:
+                if code == EMPTY:
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                row += FEN_PIECES[code % 6].upper() if code < 6 else FEN_PIECES[code % 6]
+            if empty:
+                row += str(empty)
+            rows.append(row)
+        castling = "".join(ch for ch, right in FEN_CASTLING.items() if self.castling & right) or "-"
+        ep = square_name(self.ep_square) if self.ep_square >= 0 else "-"
+        side = "w" if self.side == WHITE else "b"
+        return f"{'/'.join(rows)} {side} {castling} {ep} {self.halfmove_clock} {self.fullmove_number}"
+
+    def compute_hash(self) -> int:
+        # Full recompute of the Zobrist key, the reference for the incremental one
+        key = 0
+        for sq in iter_bits(self.occupied):
+            key ^= PIECE_KEYS[self.mailbox[sq]][sq]
+        if self.side == BLACK:
+            key ^= SIDE_KEY
+        key ^= CASTLING_KEYS[self.castling]
+        if self.ep_square >= 0:
+            key ^= EP_FILE_KEYS[self.ep_square & 7]
+        return key
+
+    def check_hash(self) -> None:
+        assert self.hash == self.compute_hash(), "Incremental Zobrist key out of sync"
+        assert (self.mg_score, self.eg_score, self.phase) == self.compute_evaluation(), \
+            "Incremental evaluation out of sync"
+
+    def sync_square(self, pos: Position) -> None:
+        # Mirror a single grid square into the bitboards and attack counts
+        sq = square(pos)
+        piece = self.grid[pos[0]][pos[1]]
+        code = EMPTY if piece is None else piece.code
+        if self.mailbox[sq] == code:
+            return
+        if self.mailbox[sq] != EMPTY:
+            self.remove_piece(sq)
+        if code != EMPTY:
+            self.put_piece(sq, code)
+
+    def put_piece(self, sq: int, code: int) -> None:
+        color = code // 6
+        # The new piece blocks rays passing through sq
+        for c in (WHITE, BLACK):
+            if code != piece_code(1 - c, KING):
+                self.update_rays_through(sq, c, -1)
+        bit = 1 << sq
+        self.hash ^= PIECE_KEYS[code][sq]
+        self.mg_score += MG_TABLE[code][sq]
+        self.eg_score += EG_TABLE[code][sq]
+        self.phase += PHASE_WEIGHTS[code]
+        self.mailbox[sq] = code
+        self.bitboards[code] |= bit
+        self.occupancy[color] |= bit
+        self.occupied |= bit
+        counts = self.attack_counts[color]
+        occupied = self.occupied & ~self.bitboards[piece_code(1 - color, KING)]
+        for target in iter_bits(piece_attacks(code, sq, occupied)):
+            counts[target] += 1
+
+    def remove_piece(self, sq: int) -> int:
+        code = self.mailbox[sq]
+        color = code // 6
+        counts = self.attack_counts[color]
+        occupied = self.occupied & ~self.bitboards[piece_code(1 - color, KING)]
+        for target in iter_bits(piece_attacks(code, sq, occupied)):
+            counts[target] -= 1
+        bit = 1 << sq
+        self.hash ^= PIECE_KEYS[code][sq]
+        self.mg_score -= MG_TABLE[code][sq]
+        self.eg_score -= EG_TABLE[code][sq]
+        self.phase -= PHASE_WEIGHTS[code]
+        self.mailbox[sq] = EMPTY
+        self.bitboards[code] ^= bit
+        self.occupancy[color] ^= bit
+        self.occupied ^= bit
+        # Rays that stopped at sq now continue past it
+        for c in (WHITE, BLACK):
+            if code != piece_code(1 - c, KING):
+                self.update_rays_through(sq, c, 1)
+        return code
+
+    def update_rays_through(self, sq: int, color: int, delta: int) -> None:
+        # Adjust the counts of squares beyond sq for every slider of color whose ray reaches sq
+        bb = self.bitboards
+        base = color * 6
+        occupied = self.occupied & ~bb[piece_code(1 - color, KING)]
+        queens = bb[base + QUEEN]
+        straight = bb[base + ROOK] | queens
+        diagonal = bb[base + BISHOP] | queens
+        if not (straight | diagonal):
+            return
+        counts = self.attack_counts[color]
+        for d in range(8):
+            sliders = straight if d in ROOK_DIRECTIONS else diagonal
+            if not sliders:
+                continue
+            # Nearest piece looking back against direction d
+            behind = RAYS[d ^ 4][sq] & occupied
+            if not behind:
+                continue
+            nearest = (behind & -behind).bit_length() - 1 if d ^ 4 < 4 else behind.bit_length() - 1
+            if not sliders >> nearest & 1:
+                continue
+            for target in RAY_SQUARES[d][sq]:
+                counts[target] += delta
+                if occupied >> target & 1:
+                    break
+
+    def sync_grid(self) -> None:
+        # Bring the Piece objects in grid in line with the mailbox after a move or undo
+        for sq in range(64):
+            r, c = POSITIONS[sq]
+            code = self.mailbox[sq]
+            piece = self.grid[r][c]
+            if code == EMPTY:
+                self.grid[r][c] = None
+            elif piece is None or piece.code != code:
+                self.grid[r][c] = PIECE_CLASSES[code % 6]((r, c), code // 6)
+            else:
+                piece.pos = (r, c)
+
+    def set_piece(self, pos: Position, piece: Optional[Piece]) -> None:
+        self.grid[pos[0]][pos[1]] = piece
+        if piece is not None:
+            piece.pos = pos
+        self.sync_square(pos)
+        if self.debug:
+            self.check_hash()
+
+    def promote(self, pos: Position, piece: Piece) -> None:
+        # Swap the piece a pawn promoted to, e.g. after the player picks one
+        self.set_piece(pos, piece)
+        if self.move_log and self.move_log[-1].is_promotion:
+            self.move_log[-1] = self.move_log[-1].with_promotion(piece.code)
 
     @staticmethod
     def in_bounds(pos: Position) -> bool:
@@ -102,20 +368,82 @@ class Board:
         return 0 <= r < 8 and 0 <= c < 8
 
     def update_attack_maps(self):
-        self.attacked_by_white = [[False] * 8 for _ in range(8)]
-        self.attacked_by_black = [[False] * 8 for _ in range(8)]
-
-        for piece in self.all_pieces():
-            attacks = piece.attack_squares(self)
-            target_map = (
-                self.attacked_by_white
-                if piece.color == "white" else self.attacked_by_black
-            )
-            for (r, c) in attacks:
-                target_map[r][c] = True
+        # Full rebuild; moves keep the counts up to date through put_piece/remove_piece
+        self.attack_counts = self.compute_attack_counts()
+
+    def compute_attack_counts(self) -> List[List[int]]:
+        # Sliders see through the enemy king so it cannot step back along the ray
+        counts = [[0] * 64, [0] * 64]
+        for color in (WHITE, BLACK):
+            occupied = self.occupied & ~self.bitboards[piece_code(1 - color, KING)]
+            for code in range(color * 6, color * 6 + 6):
+                for sq in iter_bits(self.bitboards[code]):
+                    for target in iter_bits(piece_attacks(code, sq, occupied)):
+                        counts[color][target] += 1
+        return counts
+
+    def attackers_to(self, sq: int, color: int, occupied: int) -> int:
+        bb = self.bitboards
+        base = color * 6
+        queens = bb[base + QUEEN]
+        return ((PAWN_ATTACKS[1 - color][sq] & bb[base + PAWN])
+                | (KNIGHT_ATTACKS[sq] & bb[base + KNIGHT])
+                | (KING_ATTACKS[sq] & bb[base + KING])
+                | (bishop_attacks(sq, occupied) & (bb[base + BISHOP] | queens))
+                | (rook_attacks(sq, occupied) & (bb[base + ROOK] | queens)))
+
+    def see(self, move: Move) -> int:
+        # Static exchange evaluation: centipawns won by move once both sides have recaptured on its target square
+        # with their least valuable attacker for as long as it pays. Pins are ignored.
+        bb = self.bitboards
+        dst = move.dst
+        occupied = self.occupied ^ (1 << move.src)
+        gains = [SEE_VALUES[move.captured % 6] if move.captured != EMPTY else 0]
+        on_square = SEE_VALUES[move.piece % 6]
+        if move.is_en_passant:
+            occupied ^= 1 << move.ep_captured_pos
+        if move.is_promotion:
+            on_square = SEE_VALUES[move.promoted_piece % 6]
+            gains[0] += on_square - SEE_VALUES[PAWN]
+        diagonal = bb[BISHOP] | bb[QUEEN] | bb[6 + BISHOP] | bb[6 + QUEEN]
+        straight = bb[ROOK] | bb[QUEEN] | bb[6 + ROOK] | bb[6 + QUEEN]
+        attackers = (self.attackers_to(dst, WHITE, occupied) | self.attackers_to(dst, BLACK, occupied)) & occupied
+        color = 1 - move.piece // 6
+        while True:
+            # Speculative score of the next capture, taking whatever stands on the square
+            gains.append(on_square - gains[-1])
+            own = attackers & self.occupancy[color]
+            if not own:
+                break
+            for kind in range(6):
+                pieces = own & bb[color * 6 + kind]
+                if pieces:
+                    break
+            occupied ^= pieces & -pieces
+            # Sliders lined up behind the capturer join in (x-rays)
+            if kind in (PAWN, BISHOP, QUEEN):
+                attackers |= bishop_attacks(dst, occupied) & diagonal
+            if kind in (ROOK, QUEEN):
+                attackers |= rook_attacks(dst, occupied) & straight
+            attackers &= occupied
+            on_square = SEE_VALUES[kind]
+            color ^= 1
+        # Either side may stop recapturing when continuing would cost it
+        for i in range(len(gains) - 2, 0, -1):
+            gains[i - 1] = -max(-gains[i - 1], gains[i])
+        return gains[0]
+
+    def exchange_gain(self, source: Position, dest: Position) -> int:
+        # see() of the legal move from source to dest, promoting to a queen; 0 without such a move
+        src, dst = square(source), square(dest)
+        moves = [move for move in self.legal_moves() if move.src == src and move.dst == dst]
+        if not moves:
+            return 0
+        return self.see(max(moves, key=lambda move: move.promoted_piece % 6 if move.is_promotion else 0))
 
     def switch_color(self):
-        self.to_move = "white" if self.to_move == "black" else "black"
+        self.side ^= 1
+        self.hash ^= SIDE_KEY
 
     def get_piece(self, pos: Position) -> Optional[Piece]:
         r, c = pos
@@ -124,299 +452,391 @@ class Board:
         return self.grid[r][c]
 
     def is_square_attacked(self, pos: Position, attacker_color: Color) -> bool:
-        r, c = pos
-        if attacker_color == "white":
-            return self.attacked_by_white[r][c]
-        else:
-            return self.attacked_by_black[r][c]
+        return self.attack_counts[color_index(attacker_color)][pos[0] * 8 + pos[1]] > 0
 
-    def handle_en_passant(self, piece, source: Position, dest: Position) -> None:
-        if isinstance(piece, Pawn) and abs(dest[0] - source[0]) == 2:
-            middle_row = (source[0] + dest[0]) // 2
-            if settings.undo_append:
-                self.en_passant_target = (middle_row, source[1])
-            else:
-                self.en_passant_target = None
-        # En passant capture
-        elif isinstance(piece, Pawn) and dest == self.en_passant_target:
-            captured_row = source[0]
-            captured_col = dest[1]
-            self.grid[captured_row][captured_col] = None
-        else:
-            self.en_passant_target = None
-
-    def make_random_ai_move(self, color):
-        if settings.is_promoting():
-            return
-        if self.to_move != color:
-            settings.ai_thinking = False
-            return
-        moves = self.all_legal_moves(color)
-        if len(moves) == 0:
+    def move_piece(self, source: Position, dest: Position, undo=True, promotion=QUEEN) -> None:
+        if not undo:
+            # End of an undo animation, take back the move popped by undo_two_players
+            self.take_back(self.last_move)
             return
-        try:
-            if self.timer < 0:
-                src, target = random.choice(moves)
-                self.move_piece(src, target)
-                self.timer = random.randint(100, 200)
-                settings.ai_thinking = False
-                settings.ai_ready = False
-            else:
-                self.timer -= 2
-        except ValueError as e:
-            self.timer = self.initial_time
-            print(f"Value error: {e}")
-
-    def make_ai_move(self, color, strength=0):
-        match strength:
-            case 2:
-                if self.to_move != color:
-                    return
-                best = self.find_best_move(2)
-                if best:
-                    src, dst = best
-                    self.move_piece(src, dst)
-            case 3:
-                if self.to_move != color:
-                    return
-                best = self.find_best_move(3)
-                if best:
-                    src, dst = best
-                    self.move_piece(src, dst)
-            case _:
-                self.make_random_ai_move(color)
-
-    def move_piece(self, source: Position, dest: Position, undo=True) -> None:
         # Move piece from source to target
-        piece = self.get_piece(source)
-        captured = self.get_piece(dest)
-        if piece is None:
+        if self.get_piece(source) is None:
             raise ValueError("No piece at source")
-        move = Move(piece, source, dest, captured)
-        # Special case : castling
-        if isinstance(piece, King) and abs(dest[1] - source[1]) == 2:
-            row = source[0]
-            if dest[1] == 6: # King side
-                rook_src = (row, 7)
-                rook_dst = (row, 5)
-            else: # Queen side
-                rook_src = (row, 0)
-                rook_dst = (row, 3)
-            rook = self.get_piece(rook_src)
-            move.rook = rook
-            move.rook_src = rook_src
-            move.rook_dst = rook_dst
-            if rook is not None and isinstance(rook, Rook):
-                self.grid[rook_dst[0]][rook_dst[1]] = rook
-                self.grid[rook_src[0]][rook_src[1]] = None
-                rook.move_to(self.grid, rook_dst)
-
-        if undo:
-            self.move_log.append(move)
-        self.handle_en_passant(piece, source, dest)
-        self.grid[dest[0]][dest[1]] = piece
-        if undo:
-            self.grid[source[0]][source[1]] = None
-        else:
-            self.grid[source[0]][source[1]] = self.last_move.captured if self.last_move else None
-        piece.move_to(self.grid, target=dest)
-        self.switch_color()
-        self.update_attack_maps()
-        if self.to_move == self.get_opposite_color():
-            settings.ai_thinking = True
+        src, dst = square(source), square(dest)
+        for move in self.legal_moves():
+            if move.src == src and move.dst == dst and (not move.is_promotion or move.promoted_piece % 6 == promotion):
+                self.play_move(move)
+                return
+        raise ValueError(f"Illegal move {source} -> {dest}")
+
+    def play_move(self, move: Move) -> None:
+        # Make a move on the real game: keeps the Piece objects, the move log and the GUI state up to date
+        piece = self.grid[move.src >> 3][move.src & 7]
+        self.make_move(move)
+        self.grid[move.src >> 3][move.src & 7] = None
+        self.grid[move.dst >> 3][move.dst & 7] = piece
+        piece.pos = POSITIONS[move.dst]
+        if move.castling:
+            rook = self.grid[move.rook_src >> 3][move.rook_src & 7]
+            self.grid[move.rook_src >> 3][move.rook_src & 7] = None
+            self.grid[move.rook_dst >> 3][move.rook_dst & 7] = rook
+            rook.pos = POSITIONS[move.rook_dst]
+        self.sync_grid()
+        self.move_log.append(move)
+
+    def take_back(self, move: Optional[Move]) -> None:
+        if move is None or not self.history:
+            return
+        piece = self.grid[move.dst >> 3][move.dst & 7]
+        self.unmake_move(move)
+        self.grid[move.dst >> 3][move.dst & 7] = None
+        self.grid[move.src >> 3][move.src & 7] = piece
+        self.sync_grid()
+
+    def generate_moves(self, from_mask: int = FULL) -> List[Move]:
+        # Legal moves for the side to move as Move records, one per promotion piece
+        return self.build_moves(self.generate_legal_moves(self.side, from_mask), (QUEEN, ROOK, BISHOP, KNIGHT))
+
+    def generate_captures(self) -> List[Move]:
+        # Captures, en passant and queen promotions for the quiescence search
+        promotion_row = ROW_8 if self.side == WHITE else ROW_1
+        targets = self.occupancy[1 - self.side] | (promotion_row & ~self.occupied)
+        pawn = piece_code(self.side, PAWN)
+        pairs = [(src, dst) for src, dst in self.generate_legal_moves(self.side, FULL, targets)
+                 if self.mailbox[dst] != EMPTY or self.mailbox[src] == pawn]
+        return self.build_moves(pairs, (QUEEN,))
+
+    def build_moves(self, pairs: List[Tuple[int, int]], promotions) -> List[Move]:
+        moves = []
+        mailbox = self.mailbox
+        pawn = piece_code(self.side, PAWN)
+        for src, dst in pairs:
+            code = mailbox[src]
+            if code == pawn:
+                if dst == self.ep_square:
+                    captured_pos = (src & ~7) | (dst & 7)
+                    moves.append(EnPassantMove(code, src, dst, mailbox[captured_pos], captured_pos))
+                    continue
+                if dst < 8 or dst >= 56:
+                    moves += [PromotionMove(code, src, dst, mailbox[dst], code - PAWN + kind) for kind in promotions]
+                    continue
+            elif code % 6 == KING and abs(dst - src) == 2:
+                rook_src, rook_dst = (src + 3, src + 1) if dst > src else (src - 4, src - 1)
+                moves.append(CastlingMove(code, src, dst, mailbox[rook_src], rook_src, rook_dst))
+                continue
+            moves.append(Move(code, src, dst, mailbox[dst]))
+        return moves
 
+    def make_move(self, move: Move) -> None:
+        # Search-side move: touches only the engine state, undone exactly by unmake_move
+        self.history.append((self.castling, self.ep_square, self.halfmove_clock, self.hash))
+        src, dst = move.src, move.dst
+        if move.captured != EMPTY:
+            self.remove_piece(move.ep_captured_pos if move.is_en_passant else dst)
+        self.remove_piece(src)
+        self.put_piece(dst, move.promoted_piece if move.is_promotion else move.piece)
+        if move.castling:
+            self.put_piece(move.rook_dst, self.remove_piece(move.rook_src))
+        key = self.hash ^ SIDE_KEY ^ CASTLING_KEYS[self.castling]
+        if self.ep_square >= 0:
+            key ^= EP_FILE_KEYS[self.ep_square & 7]
+        self.castling &= CASTLING_MASK[src] & CASTLING_MASK[dst]
+        key ^= CASTLING_KEYS[self.castling]
+        is_pawn = move.piece % 6 == PAWN
+        self.ep_square = (src + dst) >> 1 if is_pawn and abs(dst - src) == 16 else -1
+        if self.ep_square >= 0:
+            key ^= EP_FILE_KEYS[self.ep_square & 7]
+        self.hash = key
+        self.halfmove_clock = 0 if is_pawn or move.captured != EMPTY else self.halfmove_clock + 1
+        if self.side == BLACK:
+            self.fullmove_number += 1
+        self.side ^= 1
+        if self.debug:
+            self.check_hash()
+
+    def unmake_move(self, move: Move) -> None:
+        self.side ^= 1
+        if self.side == BLACK:
+            self.fullmove_number -= 1
+        if move.castling:
+            self.put_piece(move.rook_src, self.remove_piece(move.rook_dst))
+        self.remove_piece(move.dst)
+        self.put_piece(move.src, move.piece)
+        if move.captured != EMPTY:
+            self.put_piece(move.ep_captured_pos if move.is_en_passant else move.dst, move.captured)
+        # Restoring the saved key also undoes the piece-square updates above
+        self.castling, self.ep_square, self.halfmove_clock, self.hash = self.history.pop()
+        if self.debug:
+            self.check_hash()
 
     def is_pawn_promotion(self, pos: Position):
-        piece = self.get_piece(pos)
-        if not isinstance(piece, Pawn):
+        # Whether the last move was a pawn promoting on pos
+        if not self.move_log:
             return False
-        return True if (piece.color == "white" and pos[0] == 0) or (piece.color == "black" and pos[0] == 7) else False
+        move = self.move_log[-1]
+        return move.is_promotion and move.dst == square(pos)
 
     def all_pieces(self, color: Optional[Color] = None) -> List[Piece]:
-        pieces: List[Piece] = []
-        for row in self.grid:
-            for p in row:
-                if p is None:
-                    continue
-                if color is None or p.color == color:
-                    pieces.append(p)
-        return pieces
+        occupied = self.occupied if color is None else self.occupancy[color_index(color)]
+        return [self.grid[sq >> 3][sq & 7] for sq in iter_bits(occupied)]
 
     def is_in_check(self, color: Optional[Color] = None) -> bool:
-        king_pos = None
-        for piece in self.all_pieces(color):
-            if isinstance(piece, King):
-                king_pos = piece.pos
-                break
-        if king_pos is None:
+        side = color_index(color if color is not None else self.to_move)
+        king = self.bitboards[piece_code(side, KING)]
+        if not king:
             return False
-        opponent = "black" if color == "white" else "white"
-        return self.is_square_attacked(king_pos, opponent)
-
-    def get_all_legal_moves(self) -> List[Position]:
-        legal_moves = []
-        for piece in self.all_pieces(self.to_move):
-            legal_moves_for_piece = self.legal_moves_for_piece(piece.pos)
-            if legal_moves_for_piece is None or len(legal_moves_for_piece) == 0:
-                continue
-            legal_moves.append(self.legal_moves_for_piece(piece.pos))
-        return legal_moves
+        return self.attackers_to(lsb(king), 1 - side, self.occupied) != 0
+
+    def game_status(self) -> str:
+        # Worked out once per position: every move, undo or promotion changes the hash or the history length
+        key = (self.hash, len(self.history))
+        if key != self.status_key:
+            moves = self.generate_moves()
+            if not moves:
+                status = CHECKMATE if self.is_in_check() else STALEMATE
+            elif self.halfmove_clock >= FIFTY_MOVE_PLIES or self.is_repetition(3) or self.is_insufficient_material():
+                status = DRAW
+            else:
+                status = ONGOING
+            self.status_key = key
+            self.status = status
+            self.legal_move_cache = moves
+        return self.status
+
+    def legal_moves(self) -> List[Move]:
+        # Legal moves of the side to move, shared with game_status(); do not modify the list
+        self.game_status()
+        return self.legal_move_cache
+
+    def is_repetition(self, count: int) -> bool:
+        # The position occurred count times; only positions since the last capture or pawn move can match
+        seen = 1
+        for entry in self.history[max(0, len(self.history) - self.halfmove_clock):]:
+            if entry[3] == self.hash:
+                seen += 1
+        return seen >= count
+
+    def is_insufficient_material(self) -> bool:
+        # Bare kings, or a single minor piece left on the board
+        heavy = 0
+        for color in (WHITE, BLACK):
+            heavy |= self.bitboards[piece_code(color, PAWN)] | self.bitboards[piece_code(color, ROOK)]
+            heavy |= self.bitboards[piece_code(color, QUEEN)]
+        if heavy:
+            return False
+        kings = self.bitboards[piece_code(WHITE, KING)] | self.bitboards[piece_code(BLACK, KING)]
+        return (self.occupied & ~kings).bit_count() <= 1
+
+    def get_all_legal_moves(self) -> List[List[Position]]:
+        # Legal targets grouped by source square
+        grouped = {}
+        for move in self.legal_moves():
+            targets = grouped.setdefault(move.src, [])
+            if POSITIONS[move.dst] not in targets:
+                targets.append(POSITIONS[move.dst])
+        return list(grouped.values())
 
     def all_legal_moves(self, color):
         # Returns a list in terms of (src, target) for given color (white/black)
-        moves = []
-        for r in range(8):
-            for c in range(8):
-                piece = self.grid[r][c]
-                if piece and piece.color == color:
-                    src = (r, c)
-                    for target in self.legal_moves_for_piece(src):
-                        moves.append((src, target))
-        return moves
+        if color_index(color) == self.side:
+            pairs = dict.fromkeys((move.src, move.dst) for move in self.legal_moves())
+        else:
+            pairs = self.generate_legal_moves(color_index(color))
+        return [(POSITIONS[src], POSITIONS[dst]) for src, dst in pairs]
 
     def legal_moves_for_piece(self, pos: Position) -> List[Position]:
         piece = self.get_piece(pos)
         if piece is None:
             return []
-        legal: List[Position] = []
-        candidate_moves = piece.legal_moves(self)
-        color = piece.color
-        for target in candidate_moves:
-            src = pos
-            captured = self.grid[target[0]][target[1]]
-            self.grid[target[0]][target[1]] = piece
-            self.grid[src[0]][src[1]] = None
-            legal.append(target)
-            self.update_attack_maps()
-
-            if isinstance(piece, King):
-                pass
-            elif self.is_in_check(color) and target in legal:
-                legal.remove(target)
-
-            self.grid[src[0]][src[1]] = piece
-            self.grid[target[0]][target[1]] = captured
-            self.update_attack_maps()
-        return legal
-
-    def evaluate_material(self) -> int:
-        values = {
-            Pawn: 1,
-            Knight: 3,
-            Bishop: 3,
-            Rook: 5,
-            Queen: 9,
-            King: 0
-        }
-        score = 0
-
-        for row in self.grid:
-            for piece in row:
-                if not piece:
-                    continue
-
-                value = values[type(piece)]
-
-                if piece.color == "white":
-                    score += value
-                else:
-                    score -= value
-
-        return score
-
-    def is_checkmate(self):
-        return self.is_in_check(self.to_move) and len(self.get_all_legal_moves()) == 0
-
-    def is_stalemate(self):
-        return not self.is_in_check(self.to_move) and len(self.get_all_legal_moves()) == 0
-
-    # Undo move
-    def undo_move(self):
-        if settings.animating:
-            return
-        if settings.ai_playing.value:
-            self.undo_queue = 2 if self.to_move != self.get_opposite_color() else 1
-        else:
-            self.undo_queue = 1
-
-
-    def undo_two_players(self):
-        if len(self.move_log) == 0:
-            self.last_move = None
-            return
-        self.last_move = self.move_log.pop()
-        self.en_passant_target = None
-
-        settings.start_move_animation(self, self.last_move.dst, (self.last_move.src[0], self.last_move.src[1]), False)
-
-        if self.last_move.castling:
-            # TODO: implement castling undo
-            pass
-
-    def undo_last_simulated_move(self):
-        if not self.move_log:
-            return
-        move = self.move_log.pop()
-        piece = move.piece
-
-        self.grid[move.src[0]][move.src[1]] = piece
-        self.grid[move.dst[0]][move.dst[1]] = move.captured
-        piece.pos = move.src
-        self.switch_color()
-        self.update_attack_maps()
-
-    def minimax(self, depth: int, alpha, beta):
-        if depth == 0 or self.is_checkmate() or self.is_stalemate():
-            return self.evaluate_material()
-        moves = self.all_legal_moves(self.to_move)
-        if self.to_move == "white":
-            max_eval = float("-inf")
-
-            for src, dst in moves:
-                self.move_piece(src, dst)
-                eval = self.minimax(depth - 1, alpha, beta)
-                self.undo_last_simulated_move()
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
+        if piece.side != self.side:
+            moves = self.generate_legal_moves(piece.side, 1 << square(pos))
+            return [POSITIONS[dst] for _, dst in moves]
+        src = square(pos)
+        return list(dict.fromkeys(POSITIONS[move.dst] for move in self.legal_moves() if move.src == src))
+
+    def generate_legal_moves(self, color: int, from_mask: int = FULL, target_mask: int = FULL) -> List[Tuple[int, int]]:
+        # Checkers and pins are worked out once, so no move has to be tried on the board
+        ep = self.ep_square if color == self.side else -1
+        if ep >= 0 and not target_mask >> ep & 1 and not target_mask >> (ep + 8 if color == WHITE else ep - 8) & 1:
+            ep = -1
+        king = self.bitboards[piece_code(color, KING)]
+        if not king:
+            return self.generate_pseudo_legal_moves(color, from_mask, ep, target_mask)
+        king_sq = lsb(king)
+        moves = []
+        if from_mask & king:
+            # Attack counts see through our own king, so retreating along a checking ray is excluded
+            attacked = self.attack_counts[1 - color]
+            targets = KING_ATTACKS[king_sq] & ~self.occupancy[color] & target_mask
+            moves = [(king_sq, dst) for dst in iter_bits(targets) if not attacked[dst]]
+        checkers = self.attackers_to(king_sq, 1 - color, self.occupied)
+        if checkers & (checkers - 1):
+            # Double check: only the king can move
+            return moves
+        evasions = target_mask
+        if checkers:
+            evasions &= checkers | BETWEEN[king_sq][lsb(checkers)]
+        pinned, pin_lines = self.pinned_pieces(color, king_sq)
+        for src, dst in self.generate_pseudo_legal_moves(color, from_mask & ~king, -1, evasions):
+            if pinned >> src & 1 and not pin_lines[src] >> dst & 1:
+                continue
+            moves.append((src, dst))
+        if ep >= 0:
+            # Two pawns leave the rank at once, so en passant gets a full occupancy test
+            pawns = self.bitboards[piece_code(color, PAWN)] & from_mask
+            moves += [(src, ep) for src in iter_bits(PAWN_ATTACKS[1 - color][ep] & pawns)
+                      if self.is_legal(src, ep, color, ep)]
+        if from_mask & king and not checkers and target_mask == FULL:
+            moves += self.castling_moves(color)
+        return moves
 
-            return max_eval
+    def pinned_pieces(self, color: int, king_sq: int) -> Tuple[int, dict]:
+        # Our pieces that are the only blocker between the king and an enemy slider, with the line they may move on
+        bb = self.bitboards
+        base = (1 - color) * 6
+        queens = bb[base + QUEEN]
+        snipers = ((rook_attacks(king_sq, 0) & (bb[base + ROOK] | queens))
+                   | (bishop_attacks(king_sq, 0) & (bb[base + BISHOP] | queens)))
+        pinned = 0
+        pin_lines = {}
+        for sniper in iter_bits(snipers):
+            blockers = BETWEEN[king_sq][sniper] & self.occupied
+            if blockers and not blockers & (blockers - 1) and blockers & self.occupancy[color]:
+                pinned |= blockers
+                pin_lines[lsb(blockers)] = LINE[king_sq][sniper]
+        return pinned, pin_lines
+
+    def generate_pseudo_legal_moves(self, color: int, from_mask: int = FULL, ep: int = -1,
+                                    target_mask: int = FULL) -> List[Tuple[int, int]]:
+        # (src, dst) square pairs, castling excluded
+        bb = self.bitboards
+        base = color * 6
+        occupied = self.occupied
+        empty = ~occupied & FULL
+        enemy = self.occupancy[1 - color] & target_mask
+        targets = ~self.occupancy[color] & target_mask
+        moves = []
 
+        pawns = bb[base + PAWN] & from_mask
+        if color == WHITE:
+            single = (pawns >> 8) & empty
+            double = ((single & (ROW_2 >> 8)) >> 8) & empty & target_mask
+            single &= target_mask
+            moves += [(dst + 8, dst) for dst in iter_bits(single)]
+            moves += [(dst + 16, dst) for dst in iter_bits(double)]
+            moves += [(dst + 9, dst) for dst in iter_bits(((pawns & ~FILE_A) >> 9) & enemy)]
+            moves += [(dst + 7, dst) for dst in iter_bits(((pawns & ~FILE_H) >> 7) & enemy)]
         else:
-            min_eval = float("inf")
-
-            for src, dst in moves:
-                self.move_piece(src, dst)
-                eval = self.minimax(depth - 1, alpha, beta)
-                self.undo_last_simulated_move()
-                min_eval = min(min_eval, eval)
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-
-            return min_eval
-
-
-    def find_best_move(self, depth):
-        best_move = None
-        maximizing = (self.to_move == "white")
-        best_eval = float("-inf") if maximizing else float("inf")
-        moves = self.all_legal_moves(self.to_move)
-        for src, dst in moves:
-
-            self.move_piece(src, dst)
-            eval = self.minimax(depth - 1, float("-inf"), float("inf"))
-            self.undo_last_simulated_move()
+            single = (pawns << 8) & empty
+            double = ((single & (ROW_7 << 8)) << 8) & empty & target_mask
+            single &= target_mask
+            moves += [(dst - 8, dst) for dst in iter_bits(single)]
+            moves += [(dst - 16, dst) for dst in iter_bits(double)]
+            moves += [(dst - 7, dst) for dst in iter_bits(((pawns & ~FILE_A) << 7) & enemy)]
+            moves += [(dst - 9, dst) for dst in iter_bits(((pawns & ~FILE_H) << 9) & enemy)]
+        if ep >= 0:
+            moves += [(src, ep) for src in iter_bits(PAWN_ATTACKS[1 - color][ep] & pawns)]
+
+        for src in iter_bits(bb[base + KNIGHT] & from_mask):
+            moves += [(src, dst) for dst in iter_bits(KNIGHT_ATTACKS[src] & targets)]
+        for src in iter_bits(bb[base + BISHOP] & from_mask):
+            moves += [(src, dst) for dst in iter_bits(bishop_attacks(src, occupied) & targets)]
+        for src in iter_bits(bb[base + ROOK] & from_mask):
+            moves += [(src, dst) for dst in iter_bits(rook_attacks(src, occupied) & targets)]
+        for src in iter_bits(bb[base + QUEEN] & from_mask):
+            moves += [(src, dst) for dst in iter_bits(queen_attacks(src, occupied) & targets)]
+        for src in iter_bits(bb[base + KING] & from_mask):
+            moves += [(src, dst) for dst in iter_bits(KING_ATTACKS[src] & targets)]
+        return moves
 
-            if maximizing and eval > best_eval:
-                best_eval = eval
-                best_move = (src, dst)
+    def is_legal(self, src: int, dst: int, color: int, ep: int = -1) -> bool:
+        # Play the move on a scratch occupancy and see whether our king is attacked
+        king = self.bitboards[piece_code(color, KING)]
+        if not king:
+            return True
+        removed = 1 << dst
+        occupied = (self.occupied ^ (1 << src)) | removed
+        if dst == ep and self.mailbox[src] == piece_code(color, PAWN):
+            captured = 1 << ((src & ~7) | (ep & 7))
+            occupied ^= captured
+            removed |= captured
+        king_sq = dst if king >> src & 1 else lsb(king)
+        return not self.attackers_to(king_sq, 1 - color, occupied) & ~removed
+
+    def castling_moves(self, color: int) -> List[Tuple[int, int]]:
+        row = 7 if color == WHITE else 0
+        king_sq = row * 8 + 4
+        rights = self.castling >> (2 * color)
+        if not rights & 3:
+            return []
+        attacked = self.attack_counts[1 - color]
+        if attacked[king_sq]:
+            return []
+        moves = []
+        # (rook column, squares that must be empty, squares the king crosses)
+        for right, path, crossed in ((1, (5, 6), (5, 6)), (2, (1, 2, 3), (3, 2))):
+            if not rights & right:
+                continue
+            if any(self.mailbox[row * 8 + c] != EMPTY for c in path):
+                continue
+            if any(attacked[row * 8 + c] for c in crossed):
+                continue
+            moves.append((king_sq, row * 8 + crossed[1]))
+        return moves
 
-            elif not maximizing and eval < best_eval:
-                best_eval = eval
-                best_move = (src, dst)
+    def evaluate(self) -> int:
+        # Tapered score in centipawns from white's point of view, read off the incremental sums
+        return taper(self.mg_score, self.eg_score, self.phase)
 
-        return best_move
+    def compute_evaluation(self) -> Tuple[int, int, int]:
+        # Full recompute of (mg_score, eg_score, phase), the reference for the incremental sums
+        mg = eg = phase = 0
+        for sq in iter_bits(self.occupied):
+            code = self.mailbox[sq]
+            mg += MG_TABLE[code][sq]
+            eg += EG_TABLE[code][sq]
+            phase += PHASE_WEIGHTS[code]
+        return mg, eg, phase
 
+    def is_checkmate(self):
+        return self.game_status() == CHECKMATE
 
+    def is_stalemate(self):
+        return self.game_status() == STALEMATE
+
+    def copy(self) -> Board:
+        # Detached copy of the engine state for searching elsewhere; grid is left empty and the table, once
+        # allocated, is shared
+        board = copy.copy(self)
+        board.grid = [[None] * 8 for _ in range(8)]
+        board.bitboards = list(self.bitboards)
+        board.occupancy = list(self.occupancy)
+        board.mailbox = list(self.mailbox)
+        board.attack_counts = [list(self.attack_counts[WHITE]), list(self.attack_counts[BLACK])]
+        board.history = list(self.history)
+        board.move_log = list(self.move_log)
+        board.parallel = None
+        return board
+
+    def set_hash_size(self, size_mb: float) -> None:
+        self.hash_size_mb = size_mb
+        if self._tt is not None:
+            self._tt.resize(size_mb)
+
+    def set_search_workers(self, workers: Optional[int], deterministic: bool = False) -> None:
+        # Search with this many processes (None for one per core); 1 searches in this process
+        if self.parallel is not None:
+            self.parallel.shutdown()
+            self.parallel = None
+        if workers != 1:
+            self.parallel = ParallelSearch(workers, self.hash_size_mb, deterministic)
+
+    def find_best_move(self, depth=None, time_limit=None, node_limit=None, stats=None) -> Optional[Move]:
+        # Iterative deepening up to depth, stopped early by the time/node budget; stats is an optional SearchStats
+        if self.parallel is not None:
+            if stats is not None:
+                raise ValueError("Search statistics are only collected by a single-process search")
+            return self.parallel.find_best_move(self, depth, time_limit, node_limit)
+        search = Search(self)
+        search.stats = stats
+        return search.iterative_deepening(depth or MAX_DEPTH, time_limit, node_limit)
@@ -2,7 +2,7 @@ from typing import Tuple
 
 import pygame
 import pygame.gfxdraw
-from utilities import draw_rounded_rect, get_mouse_pos
+from utilities import draw_rounded_rect, get_mouse_pos, text_surface
 from settings import settings
 from widget import Widget
 
@@ -18,7 +18,6 @@ class Button(Widget):
         self.label = label
         self.event = event
         self.pressed = False
-        self.font = pygame.font.SysFont("Arial", 20)
         self.clicked = -1
         self.SCALE = 2
 
@@ -62,6 +61,6 @@ class Button(Widget):
         draw_rounded_rect(surface, shadow_rect, 8, (50, 50, 50))
         draw_rounded_rect(surface, self.rect, 8, self.current_color)
 
-        text_surf = self.font.render(self.label, True, (255, 255, 255))
+        text_surf = text_surface(self.label, self.font_size, (255, 255, 255))
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
@@ -0,0 +1,139 @@
+"""
+Tapered piece-square evaluation.
+
+Every piece is worth a middlegame and an endgame score: its material plus a bonus
+for the square it stands on. Board keeps both sums up to date as pieces are put
+and removed, together with a game phase counted from the remaining minor and major
+pieces, and blends the two sums by that phase. Scores are in centipawns from
+white's point of view.
+
+The tables below are written from white's side with a8 first, the same layout as
+the board's squares, so black pieces look their square up mirrored (sq ^ 56).
+"""
+from typing import List
+
+from bitboard import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+# Material by kind, in centipawns
+MG_VALUES = (100, 320, 330, 500, 900, 0)
+EG_VALUES = (120, 300, 320, 520, 950, 0)
+# Largest of the two, for bounds such as delta pruning
+MAX_VALUES = tuple(max(mg, eg) for mg, eg in zip(MG_VALUES, EG_VALUES))
+
+# Exchange values for Board.see; the king outweighs everything, so it can only take last
+SEE_VALUES = MG_VALUES[:KING] + (20000,)
+
+# Phase contributed by each kind; a full set of pieces is PHASE_TOTAL (middlegame), none is 0 (endgame)
+PHASE_VALUES = (0, 1, 1, 2, 4, 0)
+PHASE_TOTAL = 24
+
+MG_PAWN = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+)
+EG_PAWN = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     80,  80,  80,  80,  80,  80,  80,  80,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     30,  30,  30,  30,  30,  30,  30,  30,
+     15,  15,  15,  15,  15,  15,  15,  15,
+      5,   5,   5,   5,   5,   5,   5,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+      0,   0,   0,   0,   0,   0,   0,   0,
+)
+KNIGHT_TABLE = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+BISHOP_TABLE = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+ROOK_TABLE = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0,
+)
+QUEEN_TABLE = (
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+)
+# The king hides behind its pawns while queens are around and walks to the centre in the endgame
+MG_KING = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20,
+)
+EG_KING = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10,   0,   0, -10, -20, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -30,   0,   0,   0,   0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+)
+
+MG_SQUARES = {PAWN: MG_PAWN, KNIGHT: KNIGHT_TABLE, BISHOP: BISHOP_TABLE, ROOK: ROOK_TABLE, QUEEN: QUEEN_TABLE,
+              KING: MG_KING}
+EG_SQUARES = {PAWN: EG_PAWN, KNIGHT: KNIGHT_TABLE, BISHOP: BISHOP_TABLE, ROOK: ROOK_TABLE, QUEEN: QUEEN_TABLE,
+              KING: EG_KING}
+
+
+def piece_square_table(values, squares) -> List[List[int]]:
+    # Signed score of every (piece code, square): material plus square bonus, negative for black
+    table = []
+    for code in range(12):
+        kind = code % 6
+        if code < 6:
+            table.append([values[kind] + squares[kind][sq] for sq in range(64)])
+        else:
+            table.append([-values[kind] - squares[kind][sq ^ 56] for sq in range(64)])
+    return table
+
+
+MG_TABLE = piece_square_table(MG_VALUES, MG_SQUARES)
+EG_TABLE = piece_square_table(EG_VALUES, EG_SQUARES)
+# Phase contributed by each piece code
+PHASE_WEIGHTS = PHASE_VALUES * 2
+
+
+def taper(mg: int, eg: int, phase: int) -> int:
+    # Blend the two scores; promotions can push the phase past a full set
+    phase = min(phase, PHASE_TOTAL)
+    return (mg * phase + eg * (PHASE_TOTAL - phase)) // PHASE_TOTAL
@@ -1,22 +1,36 @@
+import math
+import random
+
 import pygame
 
-from board import Board
+from board import Board, ONGOING, CHECKMATE
+from bitboard import POSITIONS
 from piece import *
 from utilities import *
 from settings import settings
 from button import Button
 from widget import Slider, CheckBox, GroupWidget
+from ai_worker import SearchWorker
+from search import budget_for_strength
+from render import draw_piece, piece_sprite, prescale_sprites
 
 
 class Game:
     WINDOW_SIZE = 800
+    # Longest sleep (ms) while waiting for input with nothing moving on screen
+    IDLE_TIMEOUT = 100
     def __init__(self):
-        pygame.init()
+        settings.init_display()
         self.screen = settings.internal_window
         pygame.display.set_caption("Chess")
         self.clock = settings.clock
         self.running = True
         self.board = Board()
+        self.ai_worker = SearchWorker()
+        # Moves still to take back, one animation at a time
+        self.undo_queue = 0
+        # Random AI timer
+        self.ai_timer = random.randint(100, 200)
         # Group widgets
         self.two_players_group = GroupWidget(
                     [
@@ -59,7 +73,7 @@ class Game:
                 Button(900, 500, 150, 50, (70, 130, 180), (100, 149, 237),
                        (30, 60, 100), "Rotate board", self.board.toggle_rotation),
                 Button(900, 650, 150, 50, (70, 130, 180), (100, 149, 237), (30, 60, 100),
-                       "Undo Move", self.board.undo_move),
+                       "Undo Move", self.undo_move),
                 Button(900, 580, 150, 50, (70, 130, 180), (100, 149, 237), (30, 60, 100),
                        "Get move logs", self.get_move_log),
             ]
@@ -69,17 +83,31 @@ class Game:
             Button(100, 100, settings.WINDOW_SIZE // 9, settings.WINDOW_SIZE // 9,
                    (70, 130, 180), (100, 149, 237),(30, 60, 100), "Q", None) for _ in range(4)
         ]
+        prescale_sprites(self.WINDOW_SIZE // 8)
+        # Regions of the internal window to repaint and present, in internal window coordinates
+        self.dirty = [self.screen.get_rect()]
+        self.view_state = None
+        self.mouse_pos = (0, 0)
         self.dt = self.clock.tick(settings.fps)
 
     def select_piece_event(self, clicked: tuple[int, int]) -> None:
-        if self.board.undo_queue > 0:
+        if self.undo_queue > 0 or self.board.game_status() != ONGOING:
+            return
+        if settings.ai_playing.value and self.board.to_move == self.board.get_opposite_color():
+            # The AI is thinking about its move
             return
         piece = self.board.get_piece(clicked)
-        if piece and piece.color == self.board.to_move:
+        if piece and piece.side == self.board.side:
             self.selected = clicked
             for p in self.board.all_pieces(None):
                 p.reset_state()
             self.valid_moves = self.board.legal_moves_for_piece(clicked)
+            # Capture targets are marked once per selection, draw_board only reads the flags
+            for target in self.valid_moves:
+                p = self.board.get_piece(target)
+                if p is not None:
+                    p.can_be_captured = True
+                    p.losing_capture = self.board.exchange_gain(clicked, target) < 0
         else:
             if hasattr(self, "selected") and clicked in getattr(self, "valid_moves",
                                                                 []) and not settings.is_promoting():
@@ -90,15 +118,75 @@ class Game:
             for p in self.board.all_pieces(None):
                 p.reset_state()
 
+    def undo_move(self):
+        self.ai_worker.cancel()
+        if settings.animating:
+            return
+        if settings.ai_playing.value:
+            self.undo_queue = 2 if self.board.to_move != self.board.get_opposite_color() else 1
+        else:
+            self.undo_queue = 1
+
+    def undo_last_move(self):
+        if len(self.board.move_log) == 0:
+            self.board.last_move = None
+            return
+        move = self.board.move_log.pop()
+        self.board.last_move = move
+        # The take back itself happens in move_piece once the animation ends
+        settings.start_move_animation(self.board, POSITIONS[move.dst], POSITIONS[move.src], False)
+
+    def make_random_ai_move(self, color):
+        if settings.is_promoting():
+            return
+        if self.board.to_move != color:
+            settings.ai_thinking = False
+            return
+        if self.board.game_status() != ONGOING:
+            # Game over, nothing to wait for
+            settings.ai_thinking = False
+            settings.ai_ready = False
+            return
+        moves = self.board.all_legal_moves(color)
+        if self.ai_timer < 0:
+            src, target = random.choice(moves)
+            self.board.move_piece(src, target)
+            self.ai_timer = random.randint(100, 200)
+            settings.ai_thinking = False
+            settings.ai_ready = False
+        else:
+            self.ai_timer -= 2
+
+    def update_ai_search(self):
+        # Start the search in the worker process, then play its move once it is posted
+        color = self.board.get_opposite_color()
+        if settings.is_promoting() or settings.animating or self.undo_queue > 0:
+            return
+        if self.board.game_status() != ONGOING or self.board.to_move != color:
+            self.ai_worker.cancel()
+            settings.ai_thinking = False
+            settings.ai_ready = False
+            return
+        if not self.ai_worker.active:
+            time_limit, node_limit = budget_for_strength(settings.ai_difficulty)
+            self.ai_worker.start(self.board, time_limit, node_limit)
+            return
+        move = self.ai_worker.poll(self.board)
+        if move is not None:
+            self.board.play_move(move)
+            settings.ai_thinking = False
+            settings.ai_ready = False
+
     def handle_undo_queues(self):
-        if self.board.undo_queue > 0 and not settings.animating:
-            self.board.undo_two_players()
-            self.board.undo_queue -= 1
+        if self.undo_queue > 0 and not settings.animating:
+            self.undo_last_move()
+            self.undo_queue -= 1
             settings.ai_thinking = False
 
     def handle_event(self, event: pygame.event.Event) -> None:
         if event.type == pygame.QUIT:
             self.running = False
+            self.ai_worker.shutdown()
         if settings.animating:
             return
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -125,6 +213,8 @@ class Game:
                  settings.screen.get_height()),
                 pygame.RESIZABLE
             )
+            # Pieces stay drawn at the internal window's square size; present() scales to the new window
+            clear_render_caches()
 
         # All widget events reference
         if self.widgets.get(settings.scene):
@@ -168,14 +258,14 @@ class Game:
                 new_piece = Bishop((r, c), color)
         if not new_piece:
             return
-        self.board.grid[r][c] = new_piece
+        self.board.promote((r, c), new_piece)
         settings.reset_promotion_state()
-        self.board.update_attack_maps()
         # If two players, rotate the board
         if not settings.ai_playing.value:
             self.board.toggle_rotation()
         else:
-            self.board.make_ai_move(color, settings.ai_difficulty)
+            # The AI replies through the frame loop
+            settings.ai_thinking = True
 
     # Draw widget helper
     def draw_widget(self, scene: str):
@@ -212,11 +302,8 @@ class Game:
                 r, c = self.board.screen_to_board(r, c)
                 cx = c * square + square // 2
                 cy = r * square + square // 2
-                p = self.board.get_piece(self.board.board_to_screen(r, c))
-                if not p:
+                if not self.board.get_piece(self.board.board_to_screen(r, c)):
                     pygame.draw.circle(self.screen, (0, 255, 0), (cx, cy), square // 6)
-                else:
-                    p.can_be_captured = True
         # Animation
         if settings.animating:
             settings.anim_progress += (self.dt / 1000.0) / settings.anim_duration
@@ -224,12 +311,15 @@ class Game:
                 settings.animating = False
                 settings.anim_progress = 1.0
                 self.board.move_piece(settings.anim_start, settings.anim_end, undo=settings.undo_append)
+                if settings.undo_append and self.board.to_move == self.board.get_opposite_color():
+                    # The computer's turn
+                    settings.ai_thinking = True
 
                 # Handle promotion
                 clicked = settings.anim_end
                 if self.board.is_pawn_promotion(clicked):
                     settings.promoting_pawn_pos = clicked
-                    settings.promotion_color = self.board.get_piece(clicked).color
+                    settings.promotion_color = self.board.get_piece(clicked).side
                     self.update_promotion_buttons()
                 else:
                     # If two players, rotate board
@@ -241,17 +331,18 @@ class Game:
             if not settings.animating and settings.ai_thinking and not settings.ai_ready:
                 settings.ai_ready = True
             elif settings.ai_ready:
-                self.board.make_ai_move(self.board.get_opposite_color(), strength=settings.ai_difficulty)
-                settings.ai_thinking = False
                 if settings.ai_difficulty > 1:
-                    settings.ai_ready = False
+                    self.update_ai_search()
+                else:
+                    self.make_random_ai_move(self.board.get_opposite_color())
+                    settings.ai_thinking = False
         # handle undo queues
         self.handle_undo_queues()
         # draw pieces
         for piece in self.board.all_pieces(None):
             if settings.animating and piece == settings.anim_piece:
                 continue
-            piece.draw(self.screen, square, (0, 0), self.board)
+            draw_piece(self.screen, piece, square, (0, 0), self.board)
         # Animate the piece
         if settings.animating:
             sr, sc = self.board.board_to_screen(*settings.anim_start)
@@ -262,12 +353,8 @@ class Game:
             x = c * square + square // 2
             y = r * square + square // 2
 
-            if settings.anim_piece.sprite:
-                rect = settings.anim_piece.sprite.get_rect(center=(x, y))
-                self.screen.blit(settings.anim_piece.sprite, rect)
-            else:
-                color = (255, 255, 255) if settings.anim_piece.color == "white" else (0, 0, 0)
-                pygame.draw.circle(self.screen, color, (x, y), square // 3)
+            sprite = piece_sprite(settings.anim_piece, square)
+            self.screen.blit(sprite, sprite.get_rect(center=(x, y)))
 
         for widget in self.widgets["main"]:
             if isinstance(widget, Button):
@@ -275,18 +362,110 @@ class Game:
             widget.draw(self.screen)
 
         # draw checkmate outcome
-        if self.board.is_checkmate():
-            settings.draw_center_text(f"{"White" if self.board.to_move == "black" else "Black"} wins!",
+        status = self.board.game_status()
+        if status == CHECKMATE:
+            winner = "White" if self.board.to_move == "black" else "Black"
+            settings.draw_center_text(f"{winner} wins!",
                                       (255, 255, 255), (950, 100))
-        if self.board.is_stalemate():
+        elif status != ONGOING:
             settings.draw_center_text("Draw!", (255, 255, 255), (950, 100))
 
+    # Dirty regions
+    def mark_dirty(self, rect=None):
+        self.dirty.append(self.screen.get_rect() if rect is None else pygame.Rect(rect))
+
+    def hover_widgets(self):
+        widgets = list(self.widgets.get(settings.scene, []))
+        if settings.scene == "main" and settings.is_promoting():
+            widgets += self.promotion_buttons
+        for widget in widgets:
+            if isinstance(widget, GroupWidget):
+                yield from widget.widgets
+            else:
+                yield widget
+
+    def track_event(self, event):
+        if event.type != pygame.MOUSEMOTION or any(event.buttons):
+            # Clicks, keys, drags and window events can change anything on screen
+            self.mark_dirty()
+            return
+        pos = update_mouse_pos(event.pos, settings.screen, settings.internal_window)
+        for widget in self.hover_widgets():
+            if widget.visible and (widget.rect.collidepoint(pos) or widget.rect.collidepoint(self.mouse_pos)):
+                # Hover colors, with room for the button shadow
+                self.mark_dirty(widget.rect.inflate(10, 10))
+        self.mouse_pos = pos
+
+    def animation_bounds(self):
+        square = self.WINDOW_SIZE // 8
+        sr, sc = self.board.board_to_screen(*settings.anim_start)
+        tr, tc = self.board.board_to_screen(*settings.anim_end)
+        return pygame.Rect(sc * square, sr * square, square, square).union(
+            pygame.Rect(tc * square, tr * square, square, square))
+
+    def track_view_state(self):
+        # Anything that changes the picture without an event: moves, scenes, the end of an animation
+        state = (settings.scene, len(self.board.move_log), self.board.hash, self.board.flipped,
+                 settings.animating, settings.is_promoting())
+        if state != self.view_state:
+            self.view_state = state
+            self.mark_dirty()
+
+    def is_busy(self):
+        # Work that needs frames even when nothing is dirty
+        if settings.animating or self.undo_queue > 0:
+            return True
+        return settings.scene == "main" and settings.ai_playing.value and (
+                settings.ai_thinking or settings.ai_ready or self.ai_worker.active)
+
+    def present(self, rects):
+        # Scale only the repainted regions of the internal window onto the real one
+        screen, internal = settings.screen, settings.internal_window
+        sx = screen.get_width() / internal.get_width()
+        sy = screen.get_height() / internal.get_height()
+        updated = []
+        for rect in rects:
+            x0, y0 = int(rect.left * sx), int(rect.top * sy)
+            x1, y1 = math.ceil(rect.right * sx), math.ceil(rect.bottom * sy)
+            target = pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+            screen.blit(pygame.transform.scale(internal.subsurface(rect), target.size), target)
+            updated.append(target)
+        pygame.display.update(updated)
+
     def run(self):
         while self.running:
-            self.dt = self.clock.tick(settings.fps)
-            self.screen.fill((0, 0, 0))
+            if self.dirty or self.is_busy():
+                self.dt = self.clock.tick(settings.fps)
+                events = pygame.event.get()
+            else:
+                # Nothing is moving: sleep until the next event instead of drawing frames
+                events = [event for event in [pygame.event.wait(self.IDLE_TIMEOUT)] + pygame.event.get()
+                          if event.type != pygame.NOEVENT]
+                self.clock.tick()
+                self.dt = 0
+                if not events:
+                    continue
             settings.clicked = False
+            for event in events:
+                self.track_event(event)
+                self.handle_event(event)
+            if not self.running:
+                break
             pygame.mouse.set_cursor(settings.current_cursor)
+            if settings.scene != "main" and self.ai_worker.active:
+                # Leaving the game abandons the search
+                self.ai_worker.cancel()
+            self.track_view_state()
+            if settings.animating:
+                self.mark_dirty(self.animation_bounds())
+
+            # The scene still runs its logic every frame, drawing is clipped to the dirty regions
+            bounds = self.screen.get_rect()
+            rects = [rect.clip(bounds) for rect in self.dirty]
+            rects = [rect for rect in rects if rect.width and rect.height]
+            self.dirty = []
+            self.screen.set_clip(rects[0].unionall(rects[1:]) if rects else pygame.Rect(0, 0, 0, 0))
+            self.screen.fill((0, 0, 0))
             match settings.scene:
                 case "main_menu":
                     self.main_menu()
@@ -296,18 +475,16 @@ class Game:
                         self.draw_promotion_menu()
                 case "configuration":
                     self.configuration_menu()
-
-            for event in pygame.event.get():
-                self.handle_event(event)
-            scaled_win = pygame.transform.scale(
-                settings.internal_window,
-                (settings.screen.get_width(), settings.screen.get_height())
-            )
-            settings.screen.blit(scaled_win, (0, 0))
-            pygame.display.update()
+            self.screen.set_clip(None)
+            if rects:
+                self.present(rects)
+            # Changes made while drawing (a move played, a scene switched by a button) show up next frame
+            self.track_view_state()
 
 
-main = Game()
-main.run()
-print("Success!")
-pygame.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    # Guarded so that search processes started with spawn or forkserver can import this module
+    main = Game()
+    main.run()
+    print("Success!")
+    pygame.quit()
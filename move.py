@@ -1,25 +1,113 @@
-import pygame
+from __future__ import annotations
+
+PIECE_NAMES = ("pawn", "knight", "bishop", "rook", "queen", "king")
+
+
+def square_name(sq):
+    return "abcdefgh"[sq & 7] + str(8 - (sq >> 3))
+
+
+def parse_square(name):
+    # Inverse of square_name, e.g. "e4" -> 36
+    if len(name) != 2 or name[0] not in "abcdefgh" or name[1] not in "12345678":
+        raise ValueError(f"Invalid square: {name}")
+    return (8 - int(name[1])) * 8 + "abcdefgh".index(name[0])
+
+
+# Packed moves: bits 0-5 source square, 6-11 target square, 12-14 promotion kind (0 for none).
+# This is the move's key, which is what the transposition table, PV and killers keep.
+DST_SHIFT = 6
+PROMOTION_SHIFT = 12
+
+
+def pack_move(src, dst, promotion=0):
+    return src | dst << DST_SHIFT | promotion << PROMOTION_SHIFT
+
 
 class Move:
+    # piece/captured are piece codes (color * 6 + kind, -1 for none) and src/dst are squares (row * 8 + col).
+    # Search builds one per legal move at every node, so records are slotted: an ordinary move carries five
+    # fields and the special moves below add only their own, the rest are class-level defaults.
+    __slots__ = ("piece", "src", "dst", "captured", "packed")
+
+    # special move data
+    castling = False
+    rook = None
+    rook_src = None
+    rook_dst = None
+
+    is_en_passant = False
+    ep_captured_pos = None
+
+    is_promotion = False
+    promoted_piece = None
+
     def __init__(self, piece, src, dst, captured):
         self.piece = piece
         self.src = src
         self.dst = dst
         self.captured = captured
+        self.packed = src | dst << DST_SHIFT
 
-        # special move data
-        self.castling = False
-        self.rook = None
-        self.rook_src = None
-        self.rook_dst = None
+    def key(self) -> int:
+        # Packed from/to/promotion, enough to recognise the move in another position's move list
+        return self.packed
 
-        self.is_en_passant = False
-        self.ep_captured_pos = None
+    def with_promotion(self, promoted_piece) -> Move:
+        # The same move promoting to another piece, e.g. once the player has picked one
+        return PromotionMove(self.piece, self.src, self.dst, self.captured, promoted_piece)
 
-        self.is_promotion = False
-        self.promoted_piece = None
+    def uci(self) -> str:
+        # Long algebraic notation as used by UCI, e.g. e2e4 or e7e8q
+        name = square_name(self.src) + square_name(self.dst)
+        if self.is_promotion:
+            name += "pnbrqk"[self.promoted_piece % 6]
+        return name
 
     def log(self):
         print("-----------")
-        print(f"{type(self.piece)} {self.src} -> {self.dst}")
-        print("-----------")
\ No newline at end of file
+        color = "white" if self.piece < 6 else "black"
+        print(f"{color} {PIECE_NAMES[self.piece % 6]} {square_name(self.src)} -> {square_name(self.dst)}")
+        print("-----------")
+
+
+class PromotionMove(Move):
+    __slots__ = ("promoted_piece",)
+    is_promotion = True
+
+    def __init__(self, piece, src, dst, captured, promoted_piece):
+        self.piece = piece
+        self.src = src
+        self.dst = dst
+        self.captured = captured
+        self.promoted_piece = promoted_piece
+        self.packed = pack_move(src, dst, promoted_piece % 6)
+
+
+class EnPassantMove(Move):
+    __slots__ = ("ep_captured_pos",)
+    is_en_passant = True
+
+    def __init__(self, piece, src, dst, captured, ep_captured_pos):
+        self.piece = piece
+        self.src = src
+        self.dst = dst
+        self.captured = captured
+        self.ep_captured_pos = ep_captured_pos
+        self.packed = pack_move(src, dst)
+
+
+class CastlingMove(Move):
+    # The king's move; the rook jumps from rook_src to rook_dst
+    __slots__ = ("rook", "rook_src", "rook_dst")
+    castling = True
+
+    def __init__(self, piece, src, dst, rook, rook_src, rook_dst):
+        self.piece = piece
+        self.src = src
+        self.dst = dst
+        self.captured = -1
+        self.rook = rook
+        self.rook_src = rook_src
+        self.rook_dst = rook_dst
+        self.packed = pack_move(src, dst)
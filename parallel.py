@@ -0,0 +1,164 @@
+"""
+Root-splitting parallel search over a pool of processes.
+
+The root moves are ordered and dealt out round-robin to the workers. Each worker
+runs iterative deepening on its share with its own transposition table, and the
+move played is the best of the shares at the deepest depth they all finished. In
+deterministic mode every share starts from an empty table and only depth and node
+limits apply, so the result does not depend on timing or on which process ran it.
+
+Run this file to benchmark throughput on a few positions for 1, 2, 4... workers.
+"""
+from __future__ import annotations
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from move import Move, square_name
+from search import Search, MAX_DEPTH
+from transposition import TranspositionTable, DEFAULT_SIZE_MB, MATE
+
+# Table of the current worker process, kept between searches
+_tt = None
+
+# Benchmark positions as move lines from the start position
+BENCH_LINES = (
+    "",
+    "e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5a4 g8f6 e1g1 f8e7",
+    "d2d4 g8f6 c2c4 e7e6 b1c3 f8b4 e2e3 e8g8 f1d3 d7d5",
+    "e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6 c1e3 e7e5 d4b3 c8e6",
+    "e2e4 e7e5 g1f3 b8c6 d2d4 e5d4 f3d4 g8f6 d4c6 b7c6 e4e5 d8e7 d1e2 f6d5 c2c4",
+)
+
+
+def reset_child_signals() -> None:
+    # Called first in every search process. Under fork the child inherits SDL's handlers, which would turn
+    # terminate() and shutdown into ignored quit events; Ctrl+C is left to the parent to handle.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def init_worker(tt_size_mb: float) -> None:
+    global _tt
+    reset_child_signals()
+    _tt = TranspositionTable(tt_size_mb)
+
+
+def search_share(position, move_keys, depth, time_limit, node_limit, deterministic):
+    tt = TranspositionTable(_tt.size_mb) if deterministic else _tt
+    position.tt = tt
+    search = Search(position, tt)
+    search.root_moves = set(move_keys)
+    search.iterative_deepening(depth, time_limit, node_limit)
+    return search.iterations, search.nodes
+
+
+class ParallelSearch:
+    def __init__(self, workers: Optional[int] = None, tt_size_mb: float = DEFAULT_SIZE_MB,
+                 deterministic: bool = False):
+        self.workers = workers or os.cpu_count() or 1
+        self.tt_size_mb = tt_size_mb
+        self.deterministic = deterministic
+        self.pool = None
+        self.nodes = 0
+        self.depth_reached = 0
+        self.best_score = 0
+
+    def start_pool(self) -> None:
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                            initargs=(self.tt_size_mb,))
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def split_root(self, board, moves: List[Move]) -> List[List[int]]:
+        # Best-looking moves first so every share gets some of them; a board that never searched here has no table
+        entry = board._tt.probe(board.hash) if board._tt is not None else None
+        Search(board).order_moves(moves, 0, entry[4] if entry is not None else 0)
+        shares = [[] for _ in range(min(self.workers, len(moves)))]
+        for i, move in enumerate(moves):
+            shares[i % len(shares)].append(move.key())
+        return shares
+
+    def find_best_move(self, board, depth=None, time_limit=None, node_limit=None) -> Optional[Move]:
+        if self.deterministic:
+            if depth is None and node_limit is None:
+                raise ValueError("Deterministic search needs a depth or node limit")
+            time_limit = None
+        moves = board.generate_moves()
+        self.nodes = 0
+        if not moves:
+            return None
+        shares = self.split_root(board, moves)
+        if node_limit is not None:
+            # The node budget is for the whole search
+            node_limit = max(1, node_limit // len(shares))
+        position = board.copy()
+        position.tt = None
+        position.move_log = []
+        self.start_pool()
+        futures = [self.pool.submit(search_share, position, share, depth or MAX_DEPTH, time_limit, node_limit,
+                                    self.deterministic) for share in shares]
+        results = [future.result() for future in futures]
+        self.nodes = sum(nodes for _, nodes in results)
+
+        # Compare the shares at the deepest depth they all reached; a share that ended on a mate score is final
+        unfinished = [iterations[-1][0] for iterations, _ in results if abs(iterations[-1][2]) <= MATE - MAX_DEPTH]
+        common = min(unfinished) if unfinished else max(iterations[-1][0] for iterations, _ in results)
+        best = None
+        for iterations, _ in results:
+            entry = [iteration for iteration in iterations if iteration[0] <= common][-1]
+            if best is None or entry[2] > best[2]:
+                best = entry
+        self.depth_reached = common
+        self.best_score = best[2]
+        for move in moves:
+            if move.key() == best[1]:
+                return move
+        return None
+
+
+def play_line(board, line: str) -> None:
+    for text in line.split():
+        for move in board.generate_moves():
+            if square_name(move.src) + square_name(move.dst) == text[:4]:
+                board.make_move(move)
+                break
+        else:
+            raise ValueError(f"Illegal move {text}")
+
+
+def benchmark(max_workers: int, depth: int = 4) -> None:
+    from board import Board
+    worker_counts = []
+    workers = 1
+    while workers <= max_workers:
+        worker_counts.append(workers)
+        workers *= 2
+    base = None
+    for workers in worker_counts:
+        parallel = ParallelSearch(workers, deterministic=True)
+        parallel.start_pool()
+        nodes = 0
+        start = time.perf_counter()
+        for line in BENCH_LINES:
+            board = Board()
+            play_line(board, line)
+            parallel.find_best_move(board, depth=depth)
+            nodes += parallel.nodes
+        elapsed = time.perf_counter() - start
+        parallel.shutdown()
+        nps = nodes / elapsed
+        base = base or nps
+        print(f"{workers:3d} workers: {nodes:9d} nodes {elapsed:7.2f}s {nps:9.0f} nps x{nps / base:.2f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1,
+              int(sys.argv[2]) if len(sys.argv) > 2 else 4)
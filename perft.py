@@ -0,0 +1,106 @@
+"""
+Perft: counts the leaf nodes of the legal move tree to a fixed depth.
+
+The counts are checked against published reference values for the start position
+and the usual tricky positions, so this is both the correctness suite and the
+speed benchmark for move generation and make/unmake. Runs headlessly:
+
+    python perft.py                      # every position to depth 3
+    python perft.py -d 4 kiwipete        # one position, deeper
+    python perft.py -d 2 --divide start  # node count per root move
+    python perft.py --debug              # also check the incremental hash and evaluation at every move
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from typing import Dict, List
+
+from board import Board
+
+# name -> (FEN, reference node counts for depth 1, 2, ...)
+POSITIONS = {
+    "start": ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+              [20, 400, 8902, 197281, 4865609]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                 [48, 2039, 97862, 4085603]),
+    "position3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+                  [14, 191, 2812, 43238, 674624]),
+    "position4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+                  [6, 264, 9467, 422333]),
+    "position5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+                  [44, 1486, 62379, 2103487]),
+}
+
+
+def perft(board: Board, depth: int) -> int:
+    moves = board.generate_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move(move)
+    return nodes
+
+
+def divide(board: Board, depth: int) -> Dict[str, int]:
+    counts = {}
+    for move in board.generate_moves():
+        board.make_move(move)
+        counts[move.uci()] = perft(board, depth - 1)
+        board.unmake_move(move)
+    return counts
+
+
+def run(names: List[str], depth: int, show_divide: bool, debug: bool = False) -> bool:
+    ok = True
+    total_nodes = 0
+    total_time = 0.0
+    for name in names:
+        fen, reference = POSITIONS[name]
+        board = Board(fen)
+        board.debug = debug
+        print(f"{name}: {fen}")
+        for d in range(1, depth + 1):
+            start = time.perf_counter()
+            if show_divide and d == depth:
+                counts = divide(board, d)
+                nodes = sum(counts.values())
+                for move, count in sorted(counts.items()):
+                    print(f"    {move}: {count}")
+            else:
+                nodes = perft(board, d)
+            elapsed = time.perf_counter() - start
+            total_nodes += nodes
+            total_time += elapsed
+            if d <= len(reference):
+                result = "ok" if nodes == reference[d - 1] else f"FAIL, expected {reference[d - 1]}"
+                ok = ok and nodes == reference[d - 1]
+            else:
+                result = "no reference"
+            print(f"  depth {d}: {nodes:>10} nodes {elapsed:8.3f}s {nodes / max(elapsed, 1e-9):>10.0f} nps  {result}")
+    print(f"total: {total_nodes} nodes {total_time:.3f}s {total_nodes / max(total_time, 1e-9):.0f} nps")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Count move generation leaf nodes and check them against "
+                                                 "reference values.")
+    parser.add_argument("positions", nargs="*", help=f"positions to run, all by default: {', '.join(POSITIONS)}")
+    parser.add_argument("-d", "--depth", type=int, default=3, help="maximum depth (default 3)")
+    parser.add_argument("--divide", action="store_true", help="print the node count of every root move "
+                                                              "at the maximum depth")
+    parser.add_argument("--debug", action="store_true", help="compare the incremental Zobrist key and "
+                                                             "evaluation with a full recompute after every "
+                                                             "move (slow)")
+    args = parser.parse_args(argv)
+    for name in args.positions:
+        if name not in POSITIONS:
+            parser.error(f"unknown position {name}")
+    return 0 if run(args.positions or list(POSITIONS), args.depth, args.divide, args.debug) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
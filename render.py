@@ -0,0 +1,84 @@
+"""
+Drawing of the board's pieces.
+
+Pieces are plain engine objects without any pygame state. Their sprites come from a
+process-wide cache: each asset is decoded once, and scaled copies are kept per
+square size, so drawing a frame only blits.
+"""
+from typing import Dict, List, Tuple
+
+import pygame
+
+from bitboard import COLOR_NAMES
+from piece import Piece
+from utilities import get_piece_path_from_character
+
+# Asset letter of each piece kind
+PIECE_CHARACTERS = "pnbrqk"
+# Outline of a piece the selected one can take, by whether the exchange on its square wins or loses material
+CAPTURE_OUTLINE = (255, 0, 0)
+LOSING_CAPTURE_OUTLINE = (255, 160, 0)
+
+# (character, color) -> decoded asset
+_images: Dict[Tuple[str, str], pygame.Surface] = {}
+# (character, color, size) -> scaled sprite
+_sprites: Dict[Tuple[str, str, int], pygame.Surface] = {}
+# (character, color, size) -> outline points of the scaled sprite
+_outlines: Dict[Tuple[str, str, int], List[Tuple[int, int]]] = {}
+
+
+def load_image(character: str, color: str) -> pygame.Surface:
+    key = (character, color)
+    image = _images.get(key)
+    if image is None:
+        image = pygame.image.load(get_piece_path_from_character(character, color))
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        _images[key] = image
+    return image
+
+
+def sprite(character: str, color: str, size: int) -> pygame.Surface:
+    key = (character, color, size)
+    scaled = _sprites.get(key)
+    if scaled is None:
+        scaled = pygame.transform.smoothscale(load_image(character, color), (size, size))
+        _sprites[key] = scaled
+    return scaled
+
+
+def prescale_sprites(size: int) -> None:
+    # Scale all twelve sprites for a new square size, dropping the other sizes
+    for key in [key for key in _sprites if key[2] != size]:
+        del _sprites[key]
+        _outlines.pop(key, None)
+    for character in PIECE_CHARACTERS:
+        for color in COLOR_NAMES:
+            sprite(character, color, size)
+
+
+def piece_sprite(piece: Piece, size: int) -> pygame.Surface:
+    return sprite(PIECE_CHARACTERS[piece.kind], COLOR_NAMES[piece.side], size)
+
+
+def piece_outline(piece: Piece, size: int) -> List[Tuple[int, int]]:
+    key = (PIECE_CHARACTERS[piece.kind], COLOR_NAMES[piece.side], size)
+    points = _outlines.get(key)
+    if points is None:
+        points = pygame.mask.from_surface(sprite(*key)).outline()
+        _outlines[key] = points
+    return points
+
+
+def draw_piece(surface: pygame.Surface, piece: Piece, square_size: int, origin: Tuple[int, int] = (0, 0),
+               board=None) -> None:
+    x0, y0 = origin
+    row, col = board.screen_to_board(piece.pos[0], piece.pos[1])
+    x = x0 + col * square_size
+    y = y0 + row * square_size
+    if piece.can_be_captured:
+        points = piece_outline(piece, square_size)
+        if len(points) > 1:
+            color = LOSING_CAPTURE_OUTLINE if piece.losing_capture else CAPTURE_OUTLINE
+            pygame.draw.lines(surface, color, True, [(px + x, py + y) for px, py in points], 5)
+    surface.blit(piece_sprite(piece, square_size), (x, y))
@@ -0,0 +1,357 @@
+"""
+Alpha-beta search driven by iterative deepening.
+
+Search runs depth 1, 2, 3... on a Board until a wall-clock or node budget runs out
+and returns the best move of the last iteration that finished. The principal
+variation of each iteration is searched first in the next one.
+"""
+from __future__ import annotations
+import time
+from typing import List, Optional
+
+from bitboard import WHITE, KING, EMPTY
+from evaluation import MG_VALUES, MAX_VALUES
+from move import Move
+from transposition import EXACT, LOWER, UPPER, MATE
+
+MAX_DEPTH = 64
+# How often (in nodes) the clock is looked at
+CHECK_INTERVAL = 1024
+
+# Move ordering bands: hash/PV move, captures and promotions, killers, quiet moves by history, then captures
+# that lose material in the exchange
+HASH_MOVE_SCORE = 1000000
+CAPTURE_SCORE = 100000
+KILLER_SCORES = (90000, 80000)
+HISTORY_LIMIT = 50000
+LOSING_CAPTURE_SCORE = -1
+
+# Quiescence search: at most this many plies past the horizon, and this many nodes below each horizon node
+QSEARCH_MAX_PLY = 8
+QSEARCH_NODE_LIMIT = 10000
+# A capture that cannot lift the score to alpha even with this much to spare is skipped (centipawns)
+DELTA_MARGIN = 200
+
+# AI strength slider value -> (seconds, nodes) per move. Strength 1 is the random mover.
+STRENGTH_BUDGETS = {
+    2: (0.05, 2000),
+    3: (0.1, 5000),
+    4: (0.2, 10000),
+    5: (0.35, 20000),
+    6: (0.5, 40000),
+    7: (0.8, 80000),
+    8: (1.2, 150000),
+    9: (2.0, 300000),
+    10: (3.0, 600000),
+}
+
+
+def budget_for_strength(strength: int):
+    strength = max(2, min(10, int(strength)))
+    return STRENGTH_BUDGETS[strength]
+
+
+class Search:
+    def __init__(self, board, tt=None, qnode_limit: int = QSEARCH_NODE_LIMIT):
+        self.board = board
+        # Defaults to the board's table, taken when a search starts so ordering alone never builds it
+        self.tt = tt
+        self.nodes = 0
+        self.qnodes = 0
+        self.qnode_limit = qnode_limit
+        # qnodes count at which the current quiescence search stands pat; moved on at every horizon node
+        self.qnode_stop = qnode_limit
+        self.stopped = False
+        # Set by stop() from another thread, survives the reset at the start of a search
+        self.stop_requested = False
+        # Optional function polled with the clock, e.g. a cancel flag shared with another process
+        self.stop_callback = None
+        self.can_stop = False
+        self.deadline = None
+        self.node_limit = None
+        self.depth_reached = 0
+        self.best_score = 0
+        # Root moves to search as Move.key() values, None for all of them
+        self.root_moves = None
+        # (depth, move key, score) of every finished iteration
+        self.iterations = []
+        # Optional function called with the search after every finished iteration, e.g. to report progress
+        self.on_iteration = None
+        # Optional SearchStats filled in while searching
+        self.stats = None
+        # Principal variation of the last finished iteration, as Move.key() values
+        self.pv: List[int] = []
+        self.pv_table: List[List[int]] = [[] for _ in range(MAX_DEPTH + 1)]
+        self.following_pv = False
+        # Quiet moves that caused a beta cutoff, two per ply
+        self.killers: List[List[int]] = [[0, 0] for _ in range(MAX_DEPTH + 1)]
+        # Cutoff counts for quiet moves by [side][src][dst], kept across iterations
+        self.history = [[[0] * 64 for _ in range(64)] for _ in range(2)]
+
+    def stop(self) -> None:
+        # Honoured once depth 1 has finished, so there is always a move to return
+        self.stop_requested = True
+
+    def check_limits(self) -> None:
+        if self.stop_callback is not None and self.stop_callback():
+            self.stopped = True
+            return
+        if not self.can_stop:
+            return
+        if self.stop_requested:
+            self.stopped = True
+        elif self.node_limit is not None and self.nodes >= self.node_limit:
+            self.stopped = True
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stopped = True
+
+    def order_moves(self, moves: List[Move], ply: int, first: int) -> List[Move]:
+        killers = self.killers[ply]
+        history = self.history[self.board.side]
+
+        def score(move: Move) -> int:
+            key = move.key()
+            if key == first:
+                return HASH_MOVE_SCORE
+            if move.captured != EMPTY or move.is_promotion:
+                if not move.is_promotion and self.is_losing_capture(move):
+                    return LOSING_CAPTURE_SCORE
+                # MVV-LVA: most valuable victim first, cheapest attacker first among equals
+                victim = MG_VALUES[move.captured % 6] if move.captured != EMPTY else 0
+                if move.is_promotion:
+                    victim += MG_VALUES[move.promoted_piece % 6]
+                return CAPTURE_SCORE + victim * 10 - MG_VALUES[move.piece % 6]
+            if key == killers[0]:
+                return KILLER_SCORES[0]
+            if key == killers[1]:
+                return KILLER_SCORES[1]
+            return history[move.src][move.dst]
+
+        moves.sort(key=score, reverse=True)
+        return moves
+
+    def record_cutoff(self, move: Move, depth: int, ply: int) -> None:
+        if move.captured != EMPTY or move.is_promotion:
+            return
+        key = move.key()
+        killers = self.killers[ply]
+        if killers[0] != key:
+            killers[1] = killers[0]
+            killers[0] = key
+        history = self.history[self.board.side]
+        history[move.src][move.dst] += depth * depth
+        if history[move.src][move.dst] > HISTORY_LIMIT:
+            # Age the whole table so scores stay below the killer band
+            for side in self.history:
+                for row in side:
+                    for dst in range(64):
+                        row[dst] >>= 1
+
+    def iterative_deepening(self, max_depth: int = MAX_DEPTH, time_limit: Optional[float] = None,
+                            node_limit: Optional[int] = None) -> Optional[Move]:
+        if self.tt is None:
+            self.tt = self.board.tt
+        self.nodes = 0
+        self.qnodes = 0
+        self.stopped = False
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.node_limit = node_limit
+        self.iterations = []
+        if self.stats is not None:
+            self.stats.start(self)
+        best_move = None
+        for depth in range(1, min(max_depth, MAX_DEPTH) + 1):
+            # Depth 1 always finishes so there is a move to play
+            self.can_stop = depth > 1
+            self.following_pv = True
+            move, score = self.search_root(depth)
+            if self.stopped:
+                break
+            best_move = move
+            self.best_score = score
+            self.depth_reached = depth
+            self.pv = list(self.pv_table[0])
+            self.iterations.append((depth, move.key() if move is not None else 0, score))
+            if self.stats is not None:
+                self.stats.finish_iteration(self, depth)
+            if self.on_iteration is not None:
+                self.on_iteration(self)
+            if move is None or abs(score) > MATE - MAX_DEPTH:
+                # No legal moves, or a forced mate was found
+                break
+            self.can_stop = True
+            self.check_limits()
+            if self.stopped:
+                break
+        self.stop_requested = False
+        if self.stats is not None:
+            self.stats.update(self)
+        return best_move
+
+    def search_root(self, depth: int):
+        board = self.board
+        moves = board.generate_moves()
+        if not moves:
+            return None, 0
+        if self.root_moves is not None:
+            moves = [move for move in moves if move.key() in self.root_moves]
+        first = self.pv[0] if self.pv else 0
+        if not first:
+            entry = self.tt.probe(board.hash)
+            first = entry[4] if entry is not None else 0
+        self.order_moves(moves, 0, first)
+        self.pv_table[0] = []
+        best_move = None
+        alpha, beta = -MATE - 1, MATE + 1
+        for move in moves:
+            board.make_move(move)
+            score = -self.negamax(depth - 1, -beta, -alpha, 1)
+            board.unmake_move(move)
+            self.following_pv = False
+            if self.stopped:
+                break
+            if best_move is None or score > alpha:
+                alpha = score
+                best_move = move
+                self.pv_table[0] = [move.key()] + self.pv_table[1]
+        if not self.stopped:
+            self.tt.store(board.hash, depth, alpha, EXACT, best_move.key())
+        return best_move, alpha
+
+    def evaluate(self) -> int:
+        score = self.board.evaluate()
+        return score if self.board.side == WHITE else -score
+
+    def is_losing_capture(self, move: Move) -> bool:
+        # Taking a piece worth at least the capturer cannot lose material, anything else is settled by SEE
+        attacker = MG_VALUES[move.piece % 6]
+        victim = MG_VALUES[move.captured % 6] if move.captured != EMPTY else 0
+        if attacker <= victim or move.piece % 6 == KING:
+            return False
+        return self.board.see(move) < 0
+
+    def quiescence(self, alpha: int, beta: int, ply: int, qply: int) -> int:
+        # Resolve captures and promotions past the horizon so the static evaluation is taken on a quiet position
+        board = self.board
+        self.nodes += 1
+        self.qnodes += 1
+        if self.nodes % CHECK_INTERVAL == 0:
+            self.check_limits()
+        if self.stopped:
+            return 0
+        in_check = board.is_in_check()
+        if in_check:
+            # No standing pat in check: every evasion is searched
+            moves = board.generate_moves()
+            if not moves:
+                return ply - MATE
+            stand_pat = -MATE - 1
+        else:
+            stand_pat = self.evaluate()
+            if stand_pat >= beta:
+                if self.stats is not None:
+                    self.stats.qcutoffs += 1
+                return stand_pat
+            if qply >= QSEARCH_MAX_PLY or ply >= MAX_DEPTH or self.qnodes >= self.qnode_stop:
+                return stand_pat
+            if stand_pat > alpha:
+                alpha = stand_pat
+            moves = board.generate_captures()
+        if ply >= MAX_DEPTH:
+            return self.evaluate()
+        self.order_moves(moves, ply, 0)
+
+        best_score = stand_pat
+        for move in moves:
+            if not in_check:
+                gain = MAX_VALUES[move.captured % 6] if move.captured != EMPTY else 0
+                if move.is_promotion:
+                    gain += MAX_VALUES[move.promoted_piece % 6] - MAX_VALUES[0]
+                # Delta pruning: even winning this material outright would not reach alpha
+                if stand_pat + gain + DELTA_MARGIN <= alpha:
+                    continue
+                if not move.is_promotion and self.is_losing_capture(move):
+                    continue
+            board.make_move(move)
+            score = -self.quiescence(-beta, -alpha, ply + 1, qply + 1)
+            board.unmake_move(move)
+            if self.stopped:
+                return 0
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        if self.stats is not None:
+                            self.stats.qcutoffs += 1
+                        break
+        return best_score
+
+    def negamax(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        # Scores are from the point of view of the side to move
+        board = self.board
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0:
+            self.check_limits()
+        if self.stopped:
+            return 0
+        self.pv_table[ply] = []
+        if depth == 0 or ply >= MAX_DEPTH:
+            # Each horizon node gets its own budget, so quiescence never runs dry for the rest of the search
+            self.qnode_stop = self.qnodes + self.qnode_limit
+            return self.quiescence(alpha, beta, ply, 0)
+
+        tt = self.tt
+        entry = tt.probe(board.hash, ply)
+        hash_move = 0
+        if entry is not None:
+            hash_move = entry[4]
+            if entry[1] >= depth and not self.following_pv:
+                score, flag = entry[2], entry[3]
+                if flag == EXACT or (flag == LOWER and score >= beta) or (flag == UPPER and score <= alpha):
+                    return score
+        moves = board.generate_moves()
+        if not moves:
+            return ply - MATE if board.is_in_check() else 0
+
+        first = hash_move
+        if self.following_pv:
+            if ply < len(self.pv):
+                first = self.pv[ply]
+            else:
+                self.following_pv = False
+        self.order_moves(moves, ply, first)
+
+        original_alpha = alpha
+        best_score = -MATE - 1
+        best_move = 0
+        for move in moves:
+            board.make_move(move)
+            score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move(move)
+            # Only the first child continues down the previous principal variation
+            self.following_pv = False
+            if self.stopped:
+                return 0
+            if score > best_score:
+                best_score = score
+                best_move = move.key()
+                if score > alpha:
+                    alpha = score
+                    self.pv_table[ply] = [best_move] + self.pv_table[ply + 1]
+                    if alpha >= beta:
+                        self.record_cutoff(move, depth, ply)
+                        if self.stats is not None:
+                            self.stats.cutoffs += 1
+                            if move is moves[0]:
+                                self.stats.first_move_cutoffs += 1
+                        break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(board.hash, depth, best_score, flag, best_move, ply)
+        return best_score
@@ -1,5 +1,6 @@
 from typing import Tuple
 from bindings import BoolState
+from utilities import get_font, text_surface
 import pygame
 import pygame.gfxdraw
 
@@ -7,23 +8,18 @@ import pygame.gfxdraw
 
 class Settings:
     def __init__(self):
-        pygame.init()
-        pygame.font.init()
         self.WINDOW_SIZE = 800
         self.actual_window_size = 600 # Change this for actual size
         self.MIN_WINDOW_WIDTH = 400
         self.MIN_WINDOW_HEIGHT = 400
-        self.font = pygame.font.SysFont("Arial", 20)
+        # Display objects, created by init_display() so importing this module does not open a window
+        self.font = None
+        self.internal_window = None
+        self.screen = None
+        self.clock = None
         self.clicked = False
         self.scene = "main_menu"
-        self.internal_window = pygame.Surface((self.WINDOW_SIZE * 1.5,
-                                               self.WINDOW_SIZE))
-        self.screen = pygame.display.set_mode((self.actual_window_size * 1.5, self.actual_window_size),
-                                              pygame.RESIZABLE)
-
-
         self.current_cursor = pygame.SYSTEM_CURSOR_ARROW
-        self.clock = pygame.time.Clock()
         self.fps = 60
         # Configurations
         self.ai_playing = BoolState(False)
@@ -44,6 +40,18 @@ class Settings:
         self.anim_duration = 0.15
         self.undo_append = True
 
+    def init_display(self):
+        if self.screen is not None:
+            return
+        pygame.init()
+        pygame.font.init()
+        self.font = get_font(20)
+        self.internal_window = pygame.Surface((self.WINDOW_SIZE * 1.5,
+                                               self.WINDOW_SIZE))
+        self.screen = pygame.display.set_mode((self.actual_window_size * 1.5, self.actual_window_size),
+                                              pygame.RESIZABLE)
+        self.clock = pygame.time.Clock()
+
     # Some setters
     def set_ai_difficulty(self, value=1):
         self.ai_difficulty = value
@@ -76,8 +84,7 @@ class Settings:
         self.promoting_pawn_pos = None
 
     def draw_center_text(self, text, color, center_point, size=20):
-        self.font = pygame.font.SysFont("Arial", size)
-        text_surf = self.font.render(text, True, color)
+        text_surf = text_surface(text, size, tuple(color))
         if isinstance(center_point, pygame.Rect):
             target_center = center_point.center
         else:
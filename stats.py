@@ -0,0 +1,171 @@
+"""
+Opt-in instrumentation for the search.
+
+SearchStats collects counters for one search when attached to it (Search.stats or
+Board.find_best_move(stats=...)), with a row per finished depth. Searches without
+stats only pay an `is not None` test at each cutoff.
+
+Profiler times methods by wrapping them on their class for the duration of a
+with block, e.g. to see how move generation, evaluation and attack-map updates
+share the search time:
+
+    with Profiler(Board) as profiler:
+        board.find_best_move(depth=4)
+    print(profiler.report())
+
+Run this file to search a position with both and print the tables.
+"""
+from __future__ import annotations
+import functools
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Board methods timed by default
+PROFILE_TARGETS = ("generate_moves", "generate_captures", "legal_moves_for_piece", "make_move", "unmake_move",
+                   "update_attack_maps", "update_rays_through", "evaluate")
+
+
+def percent(part: int, whole: int) -> float:
+    return 100.0 * part / whole if whole else 0.0
+
+
+class IterationStats:
+    def __init__(self, depth: int, nodes: int, qnodes: int, cutoffs: int, first_move_cutoffs: int,
+                 tt_probes: int, tt_hits: int, seconds: float):
+        self.depth = depth
+        self.nodes = nodes
+        self.qnodes = qnodes
+        self.cutoffs = cutoffs
+        self.first_move_cutoffs = first_move_cutoffs
+        self.tt_probes = tt_probes
+        self.tt_hits = tt_hits
+        self.seconds = seconds
+
+
+class SearchStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.nodes = 0
+        self.qnodes = 0
+        # Beta cutoffs in the main search, and how many came from the first move tried
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # Beta cutoffs in quiescence, stand pat included
+        self.qcutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.seconds = 0.0
+        self.iterations: List[IterationStats] = []
+
+    def start(self, search) -> None:
+        self.reset()
+        self._start = (time.perf_counter(), search.tt.probes, search.tt.hits)
+        self._last = (0, 0, 0, 0, 0, 0, 0.0)
+
+    def finish_iteration(self, search, depth: int) -> None:
+        self.update(search)
+        totals = (self.nodes, self.qnodes, self.cutoffs, self.first_move_cutoffs, self.tt_probes, self.tt_hits,
+                  self.seconds)
+        self.iterations.append(IterationStats(depth, *(now - last for now, last in zip(totals, self._last))))
+        self._last = totals
+
+    def update(self, search) -> None:
+        start_time, start_probes, start_hits = self._start
+        self.nodes = search.nodes
+        self.qnodes = search.qnodes
+        self.tt_probes = search.tt.probes - start_probes
+        self.tt_hits = search.tt.hits - start_hits
+        self.seconds = time.perf_counter() - start_time
+
+    def first_move_cutoff_rate(self) -> float:
+        return percent(self.first_move_cutoffs, self.cutoffs)
+
+    def tt_hit_rate(self) -> float:
+        return percent(self.tt_hits, self.tt_probes)
+
+    def nps(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def report(self) -> str:
+        lines = [f"{'depth':>5} {'nodes':>10} {'qnodes':>10} {'cutoffs':>9} {'first%':>7} {'tt hit%':>8} "
+                 f"{'time':>8}"]
+        for row in self.iterations:
+            lines.append(f"{row.depth:>5} {row.nodes:>10} {row.qnodes:>10} {row.cutoffs:>9} "
+                         f"{percent(row.first_move_cutoffs, row.cutoffs):>6.1f}% "
+                         f"{percent(row.tt_hits, row.tt_probes):>7.1f}% {row.seconds:>7.3f}s")
+        lines.append(f"total {self.nodes} nodes ({self.qnodes} in quiescence), {self.nps():.0f} nps, "
+                     f"{self.cutoffs} cutoffs ({self.first_move_cutoff_rate():.1f}% first move), "
+                     f"{self.qcutoffs} quiescence cutoffs, TT {self.tt_hit_rate():.1f}% hits, {self.seconds:.3f}s")
+        return "\n".join(lines)
+
+
+class Profiler:
+    def __init__(self, cls, targets=PROFILE_TARGETS):
+        self.cls = cls
+        self.targets = tuple(targets)
+        # name -> [calls, seconds]
+        self.totals: Dict[str, List] = {name: [0, 0.0] for name in self.targets}
+        self.originals: Dict[str, object] = {}
+        self.seconds = 0.0
+
+    def wrap(self, name: str, method):
+        totals = self.totals[name]
+        clock = time.perf_counter
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                totals[0] += 1
+                totals[1] += clock() - start
+        return timed
+
+    def __enter__(self) -> Profiler:
+        for name in self.targets:
+            # Looked up in the class dict so static methods stay static
+            original = self.cls.__dict__[name]
+            self.originals[name] = original
+            if isinstance(original, staticmethod):
+                setattr(self.cls, name, staticmethod(self.wrap(name, original.__func__)))
+            else:
+                setattr(self.cls, name, self.wrap(name, original))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.seconds += time.perf_counter() - self._start
+        for name, original in self.originals.items():
+            setattr(self.cls, name, original)
+        self.originals = {}
+
+    def rows(self) -> List[Tuple[str, int, float]]:
+        return sorted(((name, calls, seconds) for name, (calls, seconds) in self.totals.items()),
+                      key=lambda row: row[2], reverse=True)
+
+    def report(self) -> str:
+        # Times are inclusive: make_move contains the attack-map updates it triggers
+        lines = [f"{'method':<24} {'calls':>10} {'total':>9} {'per call':>10} {'share':>7}"]
+        for name, calls, seconds in self.rows():
+            per_call = seconds / calls * 1e6 if calls else 0.0
+            lines.append(f"{name:<24} {calls:>10} {seconds:>8.3f}s {per_call:>8.1f}us "
+                         f"{percent(seconds, self.seconds):>6.1f}%")
+        lines.append(f"{'wall time':<24} {'':>10} {self.seconds:>8.3f}s")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from board import Board, START_FEN
+    fen = sys.argv[1] if len(sys.argv) > 1 else START_FEN
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    board = Board(fen)
+    stats = SearchStats()
+    with Profiler(Board) as profiler:
+        board.find_best_move(depth=depth, stats=stats)
+    print(stats.report())
+    print()
+    print(profiler.report())
@@ -0,0 +1,87 @@
+"""
+Fixed-size transposition table for the alpha-beta search.
+
+Entries are (key, depth, score, flag, move) tuples stored in buckets of two slots:
+the first keeps the deepest search seen for the bucket, the second is always
+replaced. The move is a packed Move.key() so entries stay small.
+"""
+from typing import Optional, Tuple
+
+EXACT, LOWER, UPPER = 0, 1, 2
+DEFAULT_SIZE_MB = 16
+# Rough cost of one entry: the tuple, its ints and the list slot holding it
+ENTRY_BYTES = 160
+MATE = 100000
+MATE_BOUND = MATE - 1000
+
+Entry = Tuple[int, int, int, int, int]
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = DEFAULT_SIZE_MB):
+        self.size_mb = size_mb
+        buckets = max(1, int(size_mb * 1024 * 1024) // (2 * ENTRY_BYTES))
+        # Round down to a power of two so the index is a mask
+        self.mask = (1 << (buckets.bit_length() - 1)) - 1
+        self.entries = [None] * ((self.mask + 1) * 2)
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def resize(self, size_mb: float) -> None:
+        self.__init__(size_mb)
+
+    def clear(self) -> None:
+        self.entries = [None] * len(self.entries)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.probes = self.hits = self.stores = self.overwrites = 0
+
+    def probe(self, key: int, ply: int = 0) -> Optional[Entry]:
+        self.probes += 1
+        index = (key & self.mask) << 1
+        for entry in (self.entries[index], self.entries[index + 1]):
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                score = entry[2]
+                # Mate scores are stored relative to the node, the search wants them relative to the root
+                if score > MATE_BOUND:
+                    return key, entry[1], score - ply, entry[3], entry[4]
+                if score < -MATE_BOUND:
+                    return key, entry[1], score + ply, entry[3], entry[4]
+                return entry
+        return None
+
+    def store(self, key: int, depth: int, score: int, flag: int, move: int, ply: int = 0) -> None:
+        self.stores += 1
+        if score > MATE_BOUND:
+            score += ply
+        elif score < -MATE_BOUND:
+            score -= ply
+        index = (key & self.mask) << 1
+        deepest = self.entries[index]
+        if deepest is not None and deepest[0] == key and not move:
+            # Keep the best move we already know for this position
+            move = deepest[4]
+        entry = (key, depth, score, flag, move)
+        if deepest is None or deepest[0] == key or depth >= deepest[1]:
+            if deepest is not None and deepest[0] != key:
+                self.overwrites += 1
+            self.entries[index] = entry
+        else:
+            if self.entries[index + 1] is not None:
+                self.overwrites += 1
+            self.entries[index + 1] = entry
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def fill_rate(self) -> float:
+        used = sum(1 for entry in self.entries if entry is not None)
+        return used / len(self.entries)
+
+    def report(self) -> str:
+        return (f"TT {self.size_mb} MB: {self.probes} probes, {self.hits} hits ({self.hit_rate():.1%}), "
+                f"{self.stores} stores, {self.overwrites} overwrites, {self.fill_rate():.1%} full")
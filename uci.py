@@ -0,0 +1,200 @@
+"""
+UCI front end: drives the engine over stdin/stdout without pygame.
+
+Supports uci, isready, ucinewgame, setoption (Hash), position, go (depth, nodes,
+movetime, wtime/btime/winc/binc/movestogo, infinite), stop and quit. The search runs
+on a thread so stop and isready are answered while it thinks; every finished
+iteration is reported as an info line with depth, score, nodes, nps and PV.
+
+    python uci.py
+"""
+from __future__ import annotations
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from bitboard import WHITE
+from board import Board, START_FEN
+from search import Search, MAX_DEPTH
+from transposition import MATE, DEFAULT_SIZE_MB
+
+ENGINE_NAME = "Chess"
+ENGINE_AUTHOR = "Chess contributors"
+# Moves assumed left in the game when the GUI does not send movestogo
+DEFAULT_MOVES_TO_GO = 30
+
+
+def score_to_uci(score: int) -> str:
+    if score > MATE - MAX_DEPTH:
+        return f"mate {(MATE - score + 1) // 2}"
+    if score < -MATE + MAX_DEPTH:
+        return f"mate -{(MATE + score) // 2}"
+    return f"cp {score}"
+
+
+def time_for_move(remaining_ms: int, increment_ms: int, moves_to_go: Optional[int]) -> float:
+    # Seconds to spend on this move out of the clock
+    budget = remaining_ms / (moves_to_go or DEFAULT_MOVES_TO_GO) + increment_ms * 0.8
+    return max(0.01, min(budget, remaining_ms * 0.5) / 1000)
+
+
+class UciEngine:
+    def __init__(self, output=sys.stdout):
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.board = Board()
+        self.search: Optional[Search] = None
+        self.thread: Optional[threading.Thread] = None
+        self.start_time = 0.0
+        self.infinite = False
+        # Set by stop; an infinite search holds its bestmove until then, as UCI requires
+        self.released = threading.Event()
+
+    def send(self, line: str) -> None:
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line: str) -> bool:
+        # Returns False once the engine should exit
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_SIZE_MB} min 1 max 1024")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            self.board.tt.clear()
+        elif command == "setoption":
+            self.set_option(args)
+        elif command == "position":
+            self.stop()
+            self.set_position(args)
+        elif command == "go":
+            self.stop()
+            self.go(args)
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+        return True
+
+    def set_option(self, args: List[str]) -> None:
+        if "name" not in args or "value" not in args:
+            return
+        name = " ".join(args[args.index("name") + 1:args.index("value")]).lower()
+        value = " ".join(args[args.index("value") + 1:])
+        if name == "hash":
+            try:
+                size = int(value)
+            except ValueError:
+                self.send(f"info string invalid Hash value {value}")
+                return
+            self.stop()
+            self.board.set_hash_size(max(1, size))
+
+    def set_position(self, args: List[str]) -> None:
+        moves_at = args.index("moves") if "moves" in args else len(args)
+        if args and args[0] == "fen":
+            fen = " ".join(args[1:moves_at])
+        else:
+            fen = START_FEN
+        try:
+            self.board.set_fen(fen)
+        except ValueError as error:
+            # set_fen checks the whole FEN before touching the board, so the previous position stays
+            self.send(f"info string {error}")
+            return
+        for text in args[moves_at + 1:]:
+            for move in self.board.legal_moves():
+                if move.uci() == text:
+                    self.board.make_move(move)
+                    break
+            else:
+                self.send(f"info string illegal move {text}")
+                return
+
+    def go(self, args: List[str]) -> None:
+        params = {}
+        for name, value in zip(args, args[1:]):
+            if value.lstrip("-").isdigit():
+                params[name] = int(value)
+        depth = params.get("depth", MAX_DEPTH)
+        node_limit = params.get("nodes")
+        time_limit = None
+        self.infinite = "infinite" in args
+        self.released = threading.Event()
+        if "movetime" in params:
+            time_limit = params["movetime"] / 1000
+        elif not self.infinite:
+            clock, increment = ("wtime", "winc") if self.board.side == WHITE else ("btime", "binc")
+            if clock in params:
+                time_limit = time_for_move(params[clock], params.get(increment, 0), params.get("movestogo"))
+        self.search = Search(self.board)
+        self.search.on_iteration = self.report
+        self.start_time = time.perf_counter()
+        self.thread = threading.Thread(target=self.think, args=(self.search, depth, time_limit, node_limit),
+                                       daemon=True)
+        self.thread.start()
+
+    def think(self, search: Search, depth: int, time_limit: Optional[float], node_limit: Optional[int]) -> None:
+        move = search.iterative_deepening(depth, time_limit, node_limit)
+        if self.infinite:
+            self.released.wait()
+        self.send(f"bestmove {move.uci() if move is not None else '0000'}")
+
+    def report(self, search: Search) -> None:
+        elapsed = time.perf_counter() - self.start_time
+        pv = " ".join(self.pv_names(search.pv))
+        self.send(f"info depth {search.depth_reached} score {score_to_uci(search.best_score)} "
+                  f"nodes {search.nodes} nps {int(search.nodes / max(elapsed, 1e-6))} "
+                  f"time {int(elapsed * 1000)} pv {pv}")
+
+    def pv_names(self, pv: List[int]) -> List[str]:
+        # Replay the PV keys on a copy to turn them into move names
+        board = self.board.copy()
+        names = []
+        for key in pv:
+            move = next((move for move in board.generate_moves() if move.key() == key), None)
+            if move is None:
+                break
+            names.append(move.uci())
+            board.make_move(move)
+        return names
+
+    def finish(self) -> None:
+        # End of input: let a limited search run out, an infinite one has nobody left to stop it
+        if self.infinite:
+            self.stop()
+        elif self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.search.stop()
+            self.released.set()
+            self.thread.join()
+            self.thread = None
+            self.search = None
+
+
+def main() -> None:
+    engine = UciEngine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    else:
+        engine.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import pygame
 import pygame.gfxdraw
+from functools import lru_cache
 from typing import Tuple
 import os
 
@@ -10,8 +11,25 @@ def debug(key, statement):
     if k[key]:
         print(f"INFO >>> {statement}")
 
-def draw_rounded_rect(surface, rect, radius, color, scale=10):
-    x, y, w, h = rect
+FONT_CACHE_SIZE = 32
+TEXT_CACHE_SIZE = 256
+SHAPE_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def get_font(size: int, name: str = "Arial") -> pygame.font.Font:
+    return pygame.font.SysFont(name, size)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def text_surface(text: str, size: int, color, antialias: bool = True) -> pygame.Surface:
+    # Rendered once per (text, size, color); callers only blit the result
+    return get_font(size).render(text, antialias, color)
+
+
+@lru_cache(maxsize=SHAPE_CACHE_SIZE)
+def rounded_rect_surface(size: Tuple[int, int], radius: int, color, scale: int = 10) -> pygame.Surface:
+    w, h = size
     sw, sh = w * scale, h * scale
     r = radius * scale
 
@@ -31,8 +49,19 @@ def draw_rounded_rect(surface, rect, radius, color, scale=10):
         pygame.gfxdraw.filled_circle(temp, cx, cy, r, color)
 
     # downscale
-    smooth = pygame.transform.smoothscale(temp, (w, h))
-    surface.blit(smooth, (x, y))
+    return pygame.transform.smoothscale(temp, (w, h))
+
+
+def clear_render_caches():
+    # Called on resize, everything is rendered again on demand
+    get_font.cache_clear()
+    text_surface.cache_clear()
+    rounded_rect_surface.cache_clear()
+
+
+def draw_rounded_rect(surface, rect, radius, color, scale=10):
+    x, y, w, h = rect
+    surface.blit(rounded_rect_surface((w, h), radius, tuple(color), scale), (x, y))
 
 def get_mouse_pos(surface: pygame.Surface, internal_surface: pygame.Surface):
     real_mouse_pos = pygame.mouse.get_pos()
@@ -1,6 +1,6 @@
 import pygame
 from abc import ABC, abstractmethod
-from utilities import clamp, draw_rounded_rect, get_mouse_pos_from_event
+from utilities import clamp, draw_rounded_rect, get_mouse_pos_from_event, get_font, text_surface
 from settings import settings
 
 
@@ -13,17 +13,18 @@ class Widget(ABC):
         self.enabled = True
         self.visible = True
         self.rect = pygame.Rect(self.x, self.y, self.w, self.h)
-        self.font = pygame.font.SysFont("Arial", 20)
+        self.font_size = 20
+        self.font = get_font(self.font_size)
 
     def render_text(self, surface: pygame.Surface, position: tuple, label: str, color: tuple=(255, 255, 255),
-                    custom_font: pygame.font.Font=None):
-        text_surf = self.font.render(label, False, color) if not custom_font else custom_font.render(label, False, color)
+                    font_size: int=None):
+        text_surf = text_surface(label, font_size or self.font_size, color, False)
         text_rect = text_surf.get_rect(center=position)
         surface.blit(text_surf, text_rect)
 
     def render_text_top(self, surface: pygame.Surface, position: tuple, label: str, color: tuple=(255, 255, 255),
-                        custom_font: pygame.font.Font=None):
-        text_surf = self.font.render(label, False, color) if not custom_font else custom_font.render(label, False, color)
+                        font_size: int=None):
+        text_surf = text_surface(label, font_size or self.font_size, color, False)
         text_rect = text_surf.get_rect(center=(position[0] + text_surf.get_width() / 2, position[1] + text_surf.get_height() / 2))
         surface.blit(text_surf, text_rect)
 
@@ -156,7 +157,7 @@ class Slider(Widget):
         knob_x = self.value_to_x()
         pygame.draw.circle(surface, (255, 255, 255), (knob_x, self.y + self.h / 2), 10)
         self.render_text(surface, (self.x + self.w / 2, self.y - self.h), self.label,
-                         (255, 255, 255), pygame.font.SysFont("Arial", 30))
+                         (255, 255, 255), 30)
         self.render_text(surface, (self.x + self.w / 2, self.y + self.h * 2), str(self.value))
 
 
@@ -0,0 +1,15 @@
+"""
+Zobrist keys for hashing positions.
+
+A position's key is the XOR of one key per (piece code, square), the side key when
+black is to move, the key of the castling rights bitmask and the key of the
+en-passant file. The keys come from a fixed seed so hashes are stable between runs.
+"""
+import random
+
+_rng = random.Random(0x2B992DDFA23249D6)
+
+PIECE_KEYS = [[_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+SIDE_KEY = _rng.getrandbits(64)
+CASTLING_KEYS = [_rng.getrandbits(64) for _ in range(16)]
+EP_FILE_KEYS = [_rng.getrandbits(64) for _ in range(8)]